@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the blank-distribution code.
+
+    python benchmarks.py group-assignment     # V4 group search on the Frutas sheet
+    python benchmarks.py backends             # V5 solver backends on every sheet
+    python benchmarks.py export               # xlsx engines vs CSV / Parquet on every sheet
+    python benchmarks.py parse                # flag/value pairing, per-line loop vs arrays
+    python benchmarks.py count -j 1 -j 4      # count every grid, split over N processes
+    python benchmarks.py suite --json run.json [--compare old.json]
+                                              # parsers + V4 / V5 solvers on fixed sheets
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd
+
+from blank_solver import (BACKENDS, BlankProblem, BlankSolver, FlowBlankSolver, PortfolioSolver,
+                          check_grid, make_solver)
+from group_assignment import _GroupTrial, prefill_full_columns, try_group_assignment
+from nutrient_store import workbook_paths
+from section_parser import PROFILES, pair_tokens, parse_section, split_sections
+from table_export import WorkbookWriter, export_frame
+from workbook_cache import read_workbook
+
+# ──────────────────────────────────────────────────────────────
+#     Fixtures
+# ──────────────────────────────────────────────────────────────
+HERE = os.path.dirname(os.path.abspath(__file__))
+# a sheet whose V4 group search succeeds, so every trial places a full group
+V4_SHEET = os.path.join(HERE, "6.6.1 Frutas.xlsx")
+
+
+def v4_state(problem):
+    """
+    The V4 state right before the group search (blank table, step 1 applied)
+    for the row / column targets of a BlankProblem; each group's F and
+    “en 100 g” targets are the sums of its per-column quotas.
+    """
+    relevant = problem.relevant_cols
+    rows = [r for r in problem.rows if r in problem.row_groups]
+    df = pd.DataFrame({"Grupos": [problem.row_groups[r] for r in rows], "Nutriente": rows,
+                       **{c: "" for c in relevant}})
+    groups = list(dict.fromkeys(df["Grupos"]))
+    row_blanks = dict(problem.row_blanks)
+    type_targets = {g: {"F": 0, "en 100 g": 0} for g in groups}
+    for (g, c), n in problem.group_col_req.items():
+        type_targets[g]["F" if c.endswith(" F") else "en 100 g"] += n
+    state = {
+        "df": df,
+        "groups": groups,
+        "modifiable_cols": relevant,
+        "remaining_col_blanks": {c: problem.col_blanks[c] for c in relevant},
+        "nutrient_to_blank_row": row_blanks,
+        "groups_blanks": {g: sum(row_blanks[r] for r in rows if problem.row_groups[r] == g)
+                          for g in groups},
+        "group_column_type_targets": type_targets,
+        "group_column_type_used": {g: {"F": 0, "en 100 g": 0} for g in groups},
+    }
+    prefill_full_columns(df, dict(state["remaining_col_blanks"]), state["remaining_col_blanks"],
+                         row_blanks, state["groups_blanks"], state["group_column_type_used"],
+                         full_blank=len(rows))
+    return state
+
+
+def search_group(state, group_name, stats=None):
+    """try_group_assignment() on `state`; the new state, or None if the group does not fit."""
+    df = state["df"]
+    out = try_group_assignment(df, group_name, df[df["Grupos"] == group_name],
+                               state["modifiable_cols"], state["remaining_col_blanks"],
+                               state["nutrient_to_blank_row"], state["groups_blanks"],
+                               state["group_column_type_targets"],
+                               state["group_column_type_used"], stats)
+    if out[0] is None:
+        return None
+    keys = ["df", "remaining_col_blanks", "nutrient_to_blank_row", "groups_blanks",
+            "group_column_type_used"]
+    return dict(state, **dict(zip(keys, out)))
+
+
+# ──────────────────────────────────────────────────────────────
+#     V4 group assignment: copy-per-trial vs in-place trial
+# ──────────────────────────────────────────────────────────────
+def _copying_trial(state, group_name, row_indices, combo_set):
+    """One trial as V4 used to run it: copy the table and every tally dict."""
+    trial_df = state["df"].copy()
+    trial_col_blanks = deepcopy(state["remaining_col_blanks"])
+    trial_row_blanks = deepcopy(state["nutrient_to_blank_row"])
+    trial_group_blanks = deepcopy(state["groups_blanks"])
+    trial_type_used = deepcopy(state["group_column_type_used"])
+    for idx, combo in zip(row_indices, combo_set):
+        nutrient = trial_df.at[idx, "Nutriente"]
+        if nutrient not in trial_row_blanks:
+            continue
+        for c in combo:
+            trial_df.at[idx, c] = "X"
+            trial_col_blanks[c] -= 1
+            trial_type_used[group_name]["F" if c.endswith("F") else "en 100 g"] += 1
+        trial_row_blanks[nutrient] -= len(combo)
+        trial_group_blanks[group_name] -= len(combo)
+
+
+def _in_place_trial(trial, combo_set):
+    """One trial with group_assignment: place every row, then undo; rows placed."""
+    placed = []
+    for t, combo in enumerate(combo_set):
+        if not trial.place(t, combo):
+            break
+        placed.append(t)
+    for t in reversed(placed):
+        trial.remove(t, combo_set[t])
+    return len(placed)
+
+
+def _measure(fn, repeat):
+    """(seconds per call, peak bytes allocated by one call)"""
+    fn()                                        # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    seconds = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def bench_group_assignment(repeat=200, sheet=V4_SHEET):
+    """
+    Every group of `sheet` in V4 order: the full search, then one trial of the
+    placement it found, copied (old V4) vs in place + undo.  Both trials place
+    every row of the group, since the placement is known to fit.
+    """
+    state = v4_state(problem_from_sheet(sheet))
+    cols = state["modifiable_cols"]
+    print(f"=== V4 group assignment on {os.path.basename(sheet)} "
+          f"({len(state['df'])} rows × {len(cols)} columns) ===")
+    print(f"{'group':<24}{'trials':>8}{'search':>12}{'copy / trial':>15}{'in place':>12}"
+          f"{'peak copy':>12}{'peak in place':>15}")
+    for group_name in state["groups"]:
+        stats = {}
+        start = time.perf_counter()
+        after = search_group(state, group_name, stats)
+        search_s = time.perf_counter() - start
+        if after is None:
+            print(f"{group_name:<24}{stats['trials']:>8}{search_s * 1e3:>9.2f} ms  no placement")
+            return
+
+        df, new = state["df"], after["df"]
+        row_indices = df.index[df["Grupos"] == group_name].tolist()
+        combo_idx = [tuple(j for j, c in enumerate(cols) if new.at[i, c] == "X" != df.at[i, c])
+                     for i in row_indices]
+        combo_named = [tuple(cols[j] for j in combo) for combo in combo_idx]
+        trial = _GroupTrial(group_name, [df.at[i, "Nutriente"] for i in row_indices], cols,
+                            state["remaining_col_blanks"], state["groups_blanks"],
+                            state["group_column_type_targets"], state["group_column_type_used"])
+        assert _in_place_trial(trial, combo_idx) == len(combo_idx)
+
+        copy_s, copy_b = _measure(
+            lambda: _copying_trial(state, group_name, row_indices, combo_named), repeat)
+        place_s, place_b = _measure(lambda: _in_place_trial(trial, combo_idx), repeat)
+        print(f"{group_name:<24}{stats['trials']:>8}{search_s * 1e3:>9.2f} ms"
+              f"{copy_s * 1e6:>12.1f} µs{place_s * 1e6:>9.1f} µs"
+              f"{copy_b:>10,} B{place_b:>13,} B")
+        state = after
+
+
+# ──────────────────────────────────────────────────────────────
+#     V5 blank problems taken from the exported sheets
+# ──────────────────────────────────────────────────────────────
+GROUP_LABELS = {
+    "elementos principales": "Elementos principales",
+    "ác. grasos": "Ácidos grasos",
+    "ácidos grasos": "Ácidos grasos",
+    "minerales": "Minerales",
+    "vitaminas": "Vitaminas",
+}
+
+# options each backend runs with, as in `blank tables ready V5.py`
+BACKEND_OPTIONS = {
+    "backtrack": {"ordering": "mrv", "memo_size": 100_000},
+    "portfolio": {},
+    "ilp": {},
+}
+
+
+def problem_from_sheet(path, quotas=True, known_cols=0):
+    """
+    A BlankProblem whose answer is the blank layout of an exported sheet.
+
+    Every '-' / empty cell of the “ F” / “en 100 g” columns (below the two
+    Energía rows) is a blank; the row, column and, with quotas=True,
+    (group, column) totals are read off that layout.  The blanks of the
+    first `known_cols` columns that have any become known cells.
+    """
+    df = read_workbook(path)
+    cols = [c for c in df.columns if c.endswith(" F") or c.endswith("en 100 g")]
+    body = df.iloc[2:]
+    body = body[body["Nutriente"] != ""]
+
+    rows, seen = [], {}
+    for name in body["Nutriente"]:
+        seen[name] = seen.get(name, 0) + 1
+        rows.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    row_groups = {r: GROUP_LABELS.get(str(g).strip().lower(), str(g).strip())
+                  for r, g in zip(rows, body["Grupos"])}
+
+    cells = body[cols].fillna("").apply(lambda s: s.str.strip()).isin(["-", "", "X"])
+    cells.index = rows
+    row_blanks = {r: int(n) for r, n in cells.sum(axis=1).items()}
+    col_blanks = {c: int(n) for c, n in cells.sum(axis=0).items()}
+
+    group_col_req = {}
+    if quotas:
+        by_group = cells.groupby(pd.Series(row_groups)).sum()
+        for c in cols:
+            if col_blanks[c]:
+                for group, n in by_group[c].items():
+                    group_col_req[(group, c)] = int(n)
+
+    known_cells = set()
+    for c in [c for c in cols if col_blanks[c]][:known_cols]:
+        known_cells |= {(r, c) for r in rows if cells.at[r, c]}
+
+    return BlankProblem(rows=rows, cols=cols, row_blanks=row_blanks, col_blanks=col_blanks,
+                        row_groups=row_groups, group_col_req=group_col_req,
+                        known_cells=known_cells)
+
+
+def _solve_in_child(queue, problem, backend, options):
+    start = time.perf_counter()
+    solver = make_solver(problem, backend, **options)
+    solution = solver.solve()
+    if getattr(solver, "partial", None) is not None:
+        queue.put((None, None))                  # the solver's own time limit
+    else:
+        queue.put((time.perf_counter() - start, solution is not None))
+
+
+def timed_solve(problem, backend, timeout, **options):
+    """
+    (seconds, found) for one solve in a child process; (None, None) on timeout.
+
+    The solver gets time_limit=timeout and stops by itself; the child is
+    only killed when it overruns that by more than a few seconds.
+    """
+    queue = mp.Queue()
+    options = dict(options, time_limit=timeout)
+    proc = mp.Process(target=_solve_in_child, args=(queue, problem, backend, options))
+    proc.start()
+    proc.join(timeout + 5)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+        return None, None
+    return queue.get(timeout=5)
+
+
+def bench_backends(backends, timeout=30.0, quotas=True):
+    print(f"=== V5 backends on every sheet ({'with' if quotas else 'without'} group quotas, "
+          f"timeout {timeout:g} s) ===")
+    print(f"{'sheet':<56}{'cells':>7}" + "".join(f"{b:>12}" for b in backends))
+    totals = {b: 0.0 for b in backends}
+    for path in workbook_paths():
+        problem = problem_from_sheet(path, quotas=quotas)
+        if not problem.relevant_cols:
+            continue
+        cells = f"{len(problem.rows)}×{len(problem.relevant_cols)}"
+        line = f"{os.path.basename(path)[:55]:<56}{cells:>7}"
+        for b in backends:
+            seconds, found = timed_solve(problem, b, timeout, **BACKEND_OPTIONS.get(b, {}))
+            if seconds is None:
+                line += f"{'timeout':>12}"
+                totals[b] += timeout
+            else:
+                line += f"{seconds * 1e3:>9.1f} ms" if found else f"{'no grid':>12}"
+                totals[b] += seconds
+        print(line, flush=True)
+    print(f"{'total (timeouts count as the limit)':<63}"
+          + "".join(f"{totals[b]:>10.2f} s" for b in backends))
+
+
+def _export_each(frames, folder, ext, **options):
+    for title, df in frames.items():
+        export_frame(df, os.path.join(folder, f"{title}.{ext}"), **options)
+
+
+def _export_book(frames, path, **options):
+    with WorkbookWriter(path, **options) as book:
+        for title, df in frames.items():
+            book.add(title, df)
+
+
+def bench_export(repeat=1):
+    frames = {os.path.splitext(os.path.basename(p))[0]:
+              read_workbook(p) for p in workbook_paths()}
+    cells = sum(df.size for df in frames.values())
+    print(f"=== Export of {len(frames)} sheets ({cells} cells) ===")
+    print(f"{'':<40}{'time':>10}{'peak alloc':>14}")
+    with tempfile.TemporaryDirectory() as folder:
+        book = os.path.join(folder, "book.xlsx")
+        cases = [
+            ("xlsx per sheet, pandas/openpyxl",
+             lambda: [df.to_excel(os.path.join(folder, t + ".xlsx"), index=False)
+                      for t, df in frames.items()]),
+            ("xlsx per sheet, openpyxl", lambda: _export_each(frames, folder, "xlsx",
+                                                              engine="openpyxl")),
+            ("xlsx per sheet, xlsxwriter", lambda: _export_each(frames, folder, "xlsx",
+                                                                constant_memory=False)),
+            ("xlsx per sheet, xlsxwriter const-mem", lambda: _export_each(frames, folder, "xlsx")),
+            ("one workbook, openpyxl", lambda: _export_book(frames, book, engine="openpyxl")),
+            ("one workbook, xlsxwriter const-mem", lambda: _export_book(frames, book)),
+            ("csv per sheet", lambda: _export_each(frames, folder, "csv")),
+            ("parquet per sheet", lambda: _export_each(frames, folder, "parquet")),
+        ]
+        for label, fn in cases:
+            seconds, peak = _measure(fn, repeat)
+            print(f"{label:<40}{seconds * 1e3:>7.0f} ms{peak / 1024:>11.0f} KB", flush=True)
+
+
+# the raw_text literals of the scripts, with the profile each one parses with
+SCRIPT_DUMPS = {
+    "blank tables ready V5.py": "page",
+    "nutrition_tables.py": "plain",
+    "nutrition_blank_tales.py": "validated",
+    "blank tables ready V3.1.py": "extended",
+}
+
+
+def script_sections():
+    """(section, profile) for every raw-text section embedded in the scripts."""
+    sections = []
+    for script, profile in SCRIPT_DUMPS.items():
+        with open(os.path.join(HERE, script), encoding="utf-8") as fh:
+            raw = re.search(r'(?:raw_text|RAW_TEXT) = r?"""(.*?)"""', fh.read(), re.S).group(1)
+        sections += [(sec, profile) for sec in split_sections(raw)]
+    return sections
+
+
+def bench_parse(pages=70, repeat=20):
+    sections = script_sections()
+    book = [sections[i % len(sections)] for i in range(pages)]
+    tokens = []
+    for sec, profile in book:
+        table = parse_section(sec, **PROFILES[profile])
+        tokens.append(([row.values for row in table.rows], len(table.foods)))
+    n_cells = sum(len(rows) * 2 * foods for rows, foods in tokens)
+
+    print(f"=== Parsing {pages} pages ({n_cells} flag/value cells) ===")
+    print(f"{'':<30}{'time / book':>14}{'peak alloc':>14}")
+    cases = [
+        ("pairing, pair_tokens()", lambda: [pair_tokens(r, f) for r, f in tokens]),
+        ("parse_section()", lambda: [parse_section(s, **PROFILES[p]) for s, p in book]),
+        ("parse_section() + typed",
+         lambda: [parse_section(s, **PROFILES[p]).to_typed_frame() for s, p in book]),
+    ]
+    for label, fn in cases:
+        seconds, peak = _measure(fn, repeat)
+        print(f"{label:<30}{seconds * 1e3:>11.2f} ms{peak / 1024:>11.0f} KB")
+
+
+def bench_count(workers=(1, 2, 4), pattern="Verduras", quotas=True, split_rows=None):
+    print(f"=== Counting every grid of the '{pattern}' sheets "
+          f"({'with' if quotas else 'without'} group quotas) ===")
+    print(f"{'sheet':<56}{'grids':>12}" + "".join(f"{f'{w} proc':>12}" for w in workers))
+    totals = dict.fromkeys(workers, 0.0)
+    for path in workbook_paths():
+        if pattern.casefold() not in os.path.basename(path).casefold():
+            continue
+        problem = problem_from_sheet(path, quotas=quotas)
+        if not problem.relevant_cols:
+            continue
+        line, grids = "", set()
+        for w in workers:
+            start = time.perf_counter()
+            grids.add(BlankSolver(problem).count(workers=w, split_rows=split_rows).total)
+            seconds = time.perf_counter() - start
+            totals[w] += seconds
+            line += f"{seconds * 1e3:>9.1f} ms"
+        count = grids.pop() if len(grids) == 1 else "MISMATCH"
+        print(f"{os.path.basename(path)[:55]:<56}{count:>12}" + line, flush=True)
+    print(f"{'total':<68}" + "".join(f"{totals[w]:>10.2f} s" for w in workers))
+
+
+# ──────────────────────────────────────────────────────────────
+#     Suite: fixed cases, JSON results
+# ──────────────────────────────────────────────────────────────
+# constraint sets replayed by the suite: name ➜ sheet
+SUITE_SHEETS = {
+    "pescados": "6.9.2 Pescados.xlsx",
+    "algas": "6.9.1 algas.xlsx",
+    "verduras": "6.4.1 Verduras.xlsx",
+    "frutas": "6.6.1 Frutas.xlsx",
+}
+
+# solver variant ➜ (runner, options); V5 variants get the full constraint set
+# (rows, columns, group quotas, one column of known cells)
+SUITE_SOLVERS = {
+    "v5-input": ("v5", dict(ordering="input")),
+    "v5-mrv": ("v5", dict(ordering="mrv")),
+    "v5-mrv-memo": ("v5", dict(ordering="mrv", memo_size=100_000)),
+    "v5-portfolio": ("portfolio", {}),           # one member per core, first answer wins
+    "v5-flow": ("flow", {}),                     # same sheet without the group quotas
+    "v5-ilp": ("ilp", {}),
+    "v4-groups": ("v4", {}),                     # F / 100 g totals per group, no known cells
+}
+
+
+def _v5_case(problem, options):
+    solver = BlankSolver(problem, **options)
+    grid = solver.solve()
+    out = {"nodes": solver.nodes, "grid": grid}
+    if solver.partial is not None:
+        out["result"] = solver.partial.describe()[0]
+    return out
+
+
+def _portfolio_case(problem, options):
+    solver = PortfolioSolver(problem, **options)
+    grid = solver.solve()
+    nodes = sum(r["nodes"] for r in solver.results)
+    out = {"nodes": nodes, "grid": grid}
+    if solver.partial is not None:
+        out["result"] = solver.partial.describe()[0]
+    return out
+
+
+def _flow_case(problem, options):
+    problem = BlankProblem(problem.rows, problem.cols, problem.row_blanks, problem.col_blanks,
+                           problem.row_groups, {}, problem.known_cells)
+    return {"nodes": None, "grid": FlowBlankSolver(problem).solve(), "problem": problem}
+
+
+def _ilp_case(problem, options):
+    return {"nodes": None, "grid": make_solver(problem, "ilp", **options).solve()}
+
+
+def _v4_case(problem, options):
+    """
+    The V4 group-by-group search on the sheet's row / column / group-type targets.
+
+    V4 balances each group's F and “en 100 g” totals rather than the
+    per-column quotas, and has no known cells; its grid is checked against
+    the rows and columns only.
+    """
+    state = v4_state(problem)
+    stats = {"trials": 0}
+    for g in state["groups"]:
+        state = search_group(state, g, stats)
+        if state is None:
+            return {"nodes": stats["trials"], "grid": None}
+    df = state["df"]
+    grid = {r: {c: int(x == "X") for c, x in zip(state["modifiable_cols"], cells)}
+            for r, *cells in df[["Nutriente"] + state["modifiable_cols"]].itertuples(index=False)}
+    checked = BlankProblem(problem.rows, problem.cols, problem.row_blanks, problem.col_blanks)
+    return {"nodes": stats["trials"], "grid": grid, "problem": checked}
+
+
+SUITE_RUNNERS = {"v5": _v5_case, "portfolio": _portfolio_case, "flow": _flow_case,
+                 "ilp": _ilp_case, "v4": _v4_case}
+
+
+def _parse_case(sections, options):
+    tables = [parse_section(sec, **PROFILES[profile]) for sec, profile in sections]
+    return {"nodes": None, "rows": sum(len(t.rows) for t in tables)}
+
+
+def _case_child(queue, runner, args, trace):
+    start = time.perf_counter()
+    out = runner(*args)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace:
+        tracemalloc.start()
+        runner(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if "grid" in out:
+        grid = out.pop("grid")
+        problem = out.pop("problem", args[0])
+        out.setdefault("result", "no grid" if grid is None else "solved")
+        out["valid"] = None if grid is None else not check_grid(problem, grid)
+    queue.put(dict(out, seconds=seconds, peak_bytes=peak))
+
+
+def run_case(runner, args, timeout, trace=True):
+    """Metrics of one case, run in a child process; result "timeout" past the limit."""
+    queue = mp.Queue()
+    proc = mp.Process(target=_case_child, args=(queue, runner, args, trace))
+    proc.start()
+    proc.join(timeout * (2 if trace else 1) + 5)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+        return {"result": "timeout", "seconds": None, "nodes": None, "peak_bytes": None}
+    if proc.exitcode != 0:
+        return {"result": f"error (exit {proc.exitcode})", "seconds": None, "nodes": None,
+                "peak_bytes": None}
+    return queue.get(timeout=5)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(timeout=10.0, variants=None, sheets=None):
+    """Every parser and solver case of the suite, as a JSON-ready dict."""
+    variants = variants or list(SUITE_SOLVERS)
+    sheets = sheets or list(SUITE_SHEETS)
+    results = []
+
+    def record(suite, case, variant, metrics):
+        results.append(dict({"suite": suite, "case": case, "variant": variant}, **metrics))
+        m = results[-1]
+        seconds = "" if m["seconds"] is None else f"{m['seconds'] * 1e3:.1f} ms"
+        nodes = "" if m.get("nodes") is None else m["nodes"]
+        peak = "" if m.get("peak_bytes") is None else f"{m['peak_bytes'] / 1024:.0f} KB"
+        result = m.get("result", f"{m.get('rows')} rows")
+        if m.get("valid") is False:
+            result += " (INVALID)"
+        print(f"{suite:<8}{case:<12}{variant:<14}{seconds:>12}{nodes:>10}{peak:>11}  {result}",
+              flush=True)
+
+    print(f"{'suite':<8}{'case':<12}{'variant':<14}{'time':>12}{'nodes':>10}{'peak':>11}  result")
+    sections = script_sections()
+    for profile in PROFILES:
+        chosen = [(sec, p) for sec, p in sections if p == profile]
+        if chosen:
+            record("parse", profile, "parse_section", run_case(_parse_case, (chosen, {}), timeout))
+
+    for name in sheets:
+        problem = problem_from_sheet(os.path.join(HERE, SUITE_SHEETS[name]), known_cols=1)
+        for variant in variants:
+            runner, options = SUITE_SOLVERS[variant]
+            if runner == "ilp" and not _has_pulp():
+                continue
+            if runner in ("v5", "portfolio"):
+                options = dict(options, time_limit=timeout)
+            record("solve", name, variant,
+                   run_case(SUITE_RUNNERS[runner], (problem, options), timeout))
+
+    return {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "timeout": timeout,
+        },
+        "results": results,
+    }
+
+
+def _has_pulp():
+    try:
+        import pulp  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compare_runs(old, new):
+    """Print time / node ratios of the cases present in both runs."""
+    before = {(r["suite"], r["case"], r["variant"]): r for r in old["results"]}
+    print(f"=== vs {old['meta'].get('commit')} ({old['meta'].get('date')}) ===")
+    for r in new["results"]:
+        o = before.get((r["suite"], r["case"], r["variant"]))
+        if not o or not o.get("seconds") or not r.get("seconds"):
+            continue
+        ratio = r["seconds"] / o["seconds"]
+        nodes = ""
+        if o.get("nodes") is not None and r.get("nodes") is not None:
+            nodes = f"  nodes {o['nodes']} ➜ {r['nodes']}"
+        print(f"{r['suite']:<8}{r['case']:<12}{r['variant']:<14}"
+              f"{o['seconds'] * 1e3:>9.1f} ➜ {r['seconds'] * 1e3:.1f} ms  (×{ratio:.2f}){nodes}")
+
+
+# ──────────────────────────────────────────────────────────────
+#     CLI
+# ──────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+    ga = sub.add_parser("group-assignment", help="V4 group search, copy vs in-place trials")
+    ga.add_argument("--repeat", type=int, default=200)
+    ga.add_argument("--sheet", default=V4_SHEET, help="exported page to take the targets from")
+    be = sub.add_parser("backends", help="V5 solver backends on every sheet")
+    be.add_argument("--backend", action="append", choices=list(BACKENDS),
+                    help="backend to run (repeatable; default: all)")
+    be.add_argument("--timeout", type=float, default=30.0, help="seconds per solve")
+    be.add_argument("--no-quotas", action="store_true",
+                    help="drop the group-column quotas (harder search)")
+    ex = sub.add_parser("export", help="xlsx engines vs CSV / Parquet on every sheet")
+    ex.add_argument("--repeat", type=int, default=1)
+    pa = sub.add_parser("parse", help="parse_section() over a book of script pages")
+    pa.add_argument("--pages", type=int, default=70)
+    pa.add_argument("--repeat", type=int, default=20)
+    co = sub.add_parser("count", help="count every grid, serial vs split over processes")
+    co.add_argument("-j", "--workers", type=int, action="append",
+                    help="process count to time (repeatable; default: 1, 2, 4)")
+    co.add_argument("--sheets", default="Verduras", help="sheets whose name contains this")
+    co.add_argument("--split-rows", type=int, help="rows enumerated before splitting")
+    co.add_argument("--no-quotas", action="store_true",
+                    help="drop the group-column quotas (many more grids)")
+    su = sub.add_parser("suite", help="parsers + V4 / V5 solvers on fixed sheets, as JSON")
+    su.add_argument("--json", help="write the results to this file")
+    su.add_argument("--compare", help="earlier --json file to compare against")
+    su.add_argument("--timeout", type=float, default=10.0, help="seconds per case")
+    su.add_argument("--variant", action="append", choices=list(SUITE_SOLVERS),
+                    help="solver variant to run (repeatable; default: all)")
+    su.add_argument("--sheet", action="append", choices=list(SUITE_SHEETS),
+                    help="constraint set to replay (repeatable; default: all)")
+    args = parser.parse_args()
+
+    if args.bench == "group-assignment":
+        bench_group_assignment(repeat=args.repeat, sheet=args.sheet)
+    elif args.bench == "backends":
+        bench_backends(args.backend or list(BACKENDS), timeout=args.timeout,
+                       quotas=not args.no_quotas)
+    elif args.bench == "export":
+        bench_export(repeat=args.repeat)
+    elif args.bench == "parse":
+        bench_parse(pages=args.pages, repeat=args.repeat)
+    elif args.bench == "count":
+        bench_count(tuple(args.workers or (1, 2, 4)), pattern=args.sheets,
+                    quotas=not args.no_quotas, split_rows=args.split_rows)
+    elif args.bench == "suite":
+        run = run_suite(timeout=args.timeout, variants=args.variant, sheets=args.sheet)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump(run, fh, ensure_ascii=False, indent=1)
+            print(f"✅ Results saved to '{args.json}'")
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as fh:
+                compare_runs(json.load(fh), run)
@@ -1,7 +1,8 @@
-import pandas as pd
 import tkinter as tk
 import os
 
+from section_parser import PROFILES, parse_section
+
 # ─────────────────────────────────────────────
 # GUI: Multi-select nutrient rows for one column
 # ─────────────────────────────────────────────
@@ -121,110 +122,15 @@ Cianocobalamina VITB12 µg 1 - 1 2.00
 # ─────────────────────────────────────────────
 # Preprocessing
 # ─────────────────────────────────────────────
-lines = raw_text.strip().splitlines()
-file_name = lines[0].strip()
-data_lines = lines[2:]
-
-replacements = {
-    "Fibra dietética": "Fibra_dietética",
-    "Hidratos de C": "Hidratos_de_C",
-    "Lípidos tot": "Lípidos_tot",
-    "RAE (vit A)": "RAE_(vit_A)",
-    "Acetato de vit A": "Acetato_de_vit_A",
-    "Ác. ascórbico": "Ác._ascórbico",
-    "Ác. fólico": "Ác._fólico",
-    "Vit E (α tocoferol)": "Vit_E_(α_tocoferol)",
-    "Vit D (colecalciferol)": "Vit_D_(colecalciferol)",
-    "Etapa de consumo": "Etapa_de_consumo"
-}
-
-for old, new in replacements.items():
-    data_lines = [line.replace(old, new) for line in data_lines]
-
-def duplicate_energia(lines):
-    result = []
-    i = 0
-    while i < len(lines):
-        result.append(lines[i])
-        if lines[i].strip().startswith("Energía ENERC") and i + 1 < len(lines):
-            next_line = lines[i + 1].strip()
-            if not next_line.startswith("Energía ENERC"):
-                result.append("Energía ENERC " + next_line)
-                i += 2
-                continue
-        i += 1
-    return result
-
-lines = duplicate_energia(data_lines)
-
-header_lines = []
-capture = False
-for line in lines:
-    if "Componente alimentario" in line:
-        capture = True
-        line = line.replace("Componente alimentario", "").strip()
-        if line:
-            header_lines.append(line)
-        continue
-    if "Nutriente" in line:
-        break
-    if capture and line.strip():
-        header_lines.append(line.strip())
-
-original_column_pairs = []
-for h in header_lines:
-    original_column_pairs.append(h + " F")
-    original_column_pairs.append(h + " en 100 g")
-
-columns = ["Grupos", "Nutriente", "Tagname", "Unidad"] + original_column_pairs
-food_count = len(header_lines)
-expected_pair_count = food_count * 2
-
-group_names = ["Elementos principales", "elementos principales", "Ác. grasos", "Minerales", "Vitaminas"]
-data_rows = []
-current_group = None
-start_index = next(i for i, line in enumerate(lines) if "Nutriente Tagname Unidad" in line) + 1
-
-special_rows = []
-for line in lines[start_index:]:
-    line = line.strip()
-    if not line:
-        continue
-    if line.lower() in [g.lower() for g in group_names]:
-        current_group = next(g for g in group_names if g.lower() == line.lower())
-        continue
-
-    parts = line.split()
-    if len(parts) < 4:
-        continue
-
-    nutrient, tagname, unit = parts[:3]
-    raw_values = parts[3:]
-
-    if nutrient in ["Orden", "Etapa_de_consumo"]:
-        filled = [""] * len(original_column_pairs)
-        for i, val in enumerate(raw_values):
-            if 4 + i < len(columns):
-                filled[i] = val
-        special_rows.append([current_group, nutrient, tagname, unit] + filled)
-        continue
-
-    if len(raw_values) == food_count:
-        processed_values = [v for val in raw_values for v in (val, val)]
-    elif len(raw_values) == expected_pair_count:
-        processed_values = raw_values[:expected_pair_count]
-    else:
-        processed_values = []
-        i = 0
-        while i < len(raw_values) and len(processed_values) < expected_pair_count:
-            processed_values.append(raw_values[i])
-            if i + 1 < len(raw_values):
-                processed_values.append(raw_values[i + 1])
-            i += 2
-    processed_values += [''] * (expected_pair_count - len(processed_values))
-    data_rows.append([current_group, nutrient, tagname, unit] + processed_values)
-
-df = pd.DataFrame(data_rows, columns=columns)
+# Parse the section (see section_parser.py); Orden / Etapa de consumo rows are
+# kept apart and appended at the end, group labels match in any case.
+table = parse_section(raw_text, **PROFILES["extended"])
+file_name = table.title
+original_column_pairs = table.food_columns
+columns = table.columns
+
+special_rows = [row.as_list() for row in table.special_rows]
+df = table.to_frame()
 
 # ─────────────────────────────────────────────
 # Ask blanks column-by-column in original order
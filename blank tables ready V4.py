@@ -4,11 +4,11 @@
 #  Build initial table  ➜  apply hard‐coded blanks  ➜  save final Excel file   #
 # --------------------------------------------------------------------------- #
 
-import pandas as pd
 import numpy as np
-import re
 from copy import deepcopy
-from itertools import combinations, product
+
+from group_assignment import prefill_full_columns, try_group_assignment
+from section_parser import parse_section
 
 # --------------------------------------------------------------------------- #``
 #  (1)  ------------  PARSE RAW TABLE  -------------------------------------- #
@@ -61,86 +61,13 @@ Cianocobalamina VITB12 µg 1 - 1 - 1 28.00 1 - 1 - 1 -
 Alimento crudo en peso neto P. comestible 50% P. comestible % P. comestible 51% P. comestible 80% P. comestible 100% P. comestible 51% P. comestible 51%
 """
 
-# text substitutions (diacritics‐safe column names)
-replacements = {
-    "Fibra dietética": "Fibra_dietética",
-    "Hidratos de C":   "Hidratos_de_C",
-    "Lípidos tot":     "Lípidos_tot",
-    "RAE (vit A)":     "RAE_(vit_A)",
-    "Ác. ascórbico":   "Ác._ascórbico",
-    "Ác. fólico":      "Ác._fólico",
-}
-
-# Keep everything except the first 2 and the last line
-lines = RAW_TEXT.strip().splitlines()
-data_lines = lines[2:-1]
-for i, line in enumerate(data_lines):
-    for old, new in replacements.items():
-        data_lines[i] = data_lines[i].replace(old, new)
-RAW_TEXT = "\n".join(data_lines)
-
-# Fix missing “Energía ENERC” prefix on the next line
-tmp, fixed = RAW_TEXT.splitlines(), []
-i = 0
-while i < len(tmp):
-    fixed.append(tmp[i])
-    if tmp[i].lstrip().startswith("Energía ENERC") and i + 1 < len(tmp):
-        nxt = tmp[i + 1]
-        if not nxt.lstrip().startswith("Energía ENERC"):
-            fixed.append("Energía ENERC " + nxt)
-            i += 2
-            continue
-    i += 1
-RAW_TEXT = "\n".join(fixed)
-
-# ----------- build headers (Food 1 F, Food 1 en 100 g, Food 2 F, …) ----------
-lines = RAW_TEXT.splitlines()
-foods = []
-cap = False
-for ln in lines:
-    if "Componente alimentario" in ln:
-        cap = True
-        ln = ln.replace("Componente alimentario", "").strip()
-        if ln:
-            foods.append(ln)
-        continue
-    if "Nutriente" in ln:
-        break
-    if cap and ln.strip():
-        foods.append(ln.strip())
-
-mov_cols = [col for food in foods for col in (f"{food} F", f"{food} en 100 g")]
-columns  = ["Grupos", "Nutriente", "Tagname", "Unidad"] + mov_cols
+# Parse the section (see section_parser.py): first 2 lines and last line dropped
+table = parse_section(RAW_TEXT)
 
-# ----------------- numeric rows ----------------------------------------------
-start = next(i for i, ln in enumerate(lines) if "Nutriente Tagname Unidad" in ln) + 1
-group_lbls = ["Elementos principales", "elementos principales", "Ác. grasos", "Minerales", "Vitaminas"]
-rows, grp = [], None
-need = len(foods) * 2       # flag/value per food
+mov_cols = table.food_columns
+columns  = table.columns
 
-for ln in lines[start:]:
-    if not (ln := ln.strip()):
-        continue
-    if ln in group_lbls:
-        grp = ln
-        continue
-    parts = ln.split()
-    if len(parts) < 4:
-        continue
-    nutr, tag, unit, *vals = parts
-    if len(vals) == len(foods):
-        # only one number per food → duplicate to (F, En 100 g)
-        vals = [v for v in vals for _ in (0, 1)]
-    elif len(vals) < need:
-        pad, j = [], 0
-        while j < len(vals):
-            pad.append(vals[j])
-            pad.append(vals[j + 1] if j + 1 < len(vals) else "")
-            j += 2
-        vals = (pad + [""])[:need]
-    rows.append([grp, nutr, tag, unit] + vals[:need])
-
-df = pd.DataFrame(rows, columns=columns)
+df = table.to_frame()
 df.to_excel("original_table.xlsx", index=False)
 print("✅  Original table saved to 'original_table.xlsx'")
 
@@ -221,90 +148,18 @@ group_column_type_used = {
 }
 
 # Step 1 – Pre-fill fully blank columns (27 blanks)
-FULL_BLANK = 27
-for col, target in col_targets.items():
-    if target == FULL_BLANK:
-        for i, row in df.iterrows():
-            nutrient = row['Nutriente']
-            group = row['Grupos']
-            if nutrient in nutrient_to_blank_row and nutrient_to_blank_row[nutrient] > 0:
-                df.at[i, col] = "X"
-                remaining_col_blanks[col] -= 1
-                nutrient_to_blank_row[nutrient] -= 1
-                if group in groups_blanks:
-                    groups_blanks[group] -= 1
-                if group in group_column_type_used:
-                    if col.endswith("F"):
-                        group_column_type_used[group]["F"] += 1
-                    elif col.endswith("en 100 g"):
-                        group_column_type_used[group]["en 100 g"] += 1
-
-# Step 2 – Backtracking group assignment
-def try_group_assignment(group_name, group_rows):
-    row_indices = group_rows.index.tolist()
-    needed_blanks = [nutrient_to_blank_row.get(df.at[i, "Nutriente"], 0) for i in row_indices]
-    
-    col_combos_per_row = []
-    for i, blanks in zip(row_indices, needed_blanks):
-        valid_cols = [col for col in modifiable_cols if remaining_col_blanks[col] > 0]
-        combos = list(combinations(valid_cols, blanks))
-        col_combos_per_row.append(combos)
-
-    for row_combo_set in product(*col_combos_per_row):
-        # Start trial
-        trial_df = df.copy()
-        trial_col_blanks = deepcopy(remaining_col_blanks)
-        trial_row_blanks = deepcopy(nutrient_to_blank_row)
-        trial_group_blanks = deepcopy(groups_blanks)
-        trial_type_used = deepcopy(group_column_type_used)
-
-        valid = True
-        for idx, combo in zip(row_indices, row_combo_set):
-            nutrient = trial_df.at[idx, "Nutriente"]
-            if nutrient not in trial_row_blanks:
-                continue  # Skip rows like 'Energía' that are not part of the blanking rules
-
-            counts = {'F': 0, 'en 100 g': 0}
-
-            for c in combo:
-                if trial_col_blanks[c] <= 0:
-                    valid = False
-                    break
-                if c.endswith("F"):
-                    counts["F"] += 1
-                elif c.endswith("en 100 g"):
-                    counts["en 100 g"] += 1
-            if not valid:
-                break
-            if group_name in group_column_type_targets:
-                limits = group_column_type_targets[group_name]
-                used = trial_type_used[group_name]
-                if any(used[t] + counts[t] > limits[t] for t in counts):
-                    valid = False
-                    break
-            if trial_group_blanks.get(group_name, 0) < sum(counts.values()):
-                valid = False
-                break
-
-            for c in combo:
-                trial_df.at[idx, c] = "X"
-                trial_col_blanks[c] -= 1
-            trial_row_blanks[nutrient] -= sum(counts.values())
-            trial_group_blanks[group_name] -= sum(counts.values())
-            for t in counts:
-                trial_type_used[group_name][t] += counts[t]
-
-        if valid:
-            return trial_df, trial_col_blanks, trial_row_blanks, trial_group_blanks, trial_type_used
-
-    return None, None, None, None, None
+prefill_full_columns(df, col_targets, remaining_col_blanks, nutrient_to_blank_row,
+                     groups_blanks, group_column_type_used)
 
+# Step 2 – Backtracking group assignment (see group_assignment.py)
 # Loop over groups
 for group in df['Grupos'].unique():
     if group not in groups_blanks:
         continue
     group_rows = df[df['Grupos'] == group]
-    result = try_group_assignment(group, group_rows)
+    result = try_group_assignment(df, group, group_rows, modifiable_cols, remaining_col_blanks,
+                                  nutrient_to_blank_row, groups_blanks,
+                                  group_column_type_targets, group_column_type_used)
     if result[0] is not None:
         df, remaining_col_blanks, nutrient_to_blank_row, groups_blanks, group_column_type_used = result
     else:
@@ -10,14 +10,39 @@ Blank-grid solver with
 The first grid satisfying everything is written to blank_grid.xlsx
 """
 
-import itertools
-from collections import defaultdict
+import argparse
 import pandas as pd
 import re
 import numpy as np
 import xlsxwriter as xlsxwriter
 import random
 
+from blank_solver import BACKENDS, BlankProblem, BlankSolver, log_progress, make_solver
+from section_parser import parse_section
+
+parser = argparse.ArgumentParser(description="Blank-grid solver for one nutrition table.")
+parser.add_argument("--backend", choices=list(BACKENDS), default="backtrack",
+                    help="solver used to place the blanks (default: backtrack)")
+parser.add_argument("--count-solutions", action="store_true",
+                    help="also count every valid grid and save, per cell, the share of "
+                         "grids in which it is blank to blank_certainty.xlsx")
+parser.add_argument("--workers", type=int, default=1, metavar="N",
+                    help="--count-solutions: split the enumeration over N processes")
+parser.add_argument("--stats", action="store_true",
+                    help="backtrack: also count prunes per constraint and measure the peak "
+                         "memory of the search (slows it down)")
+parser.add_argument("--progress", type=int, metavar="N", default=0,
+                    help="backtrack: log nodes, depth and prunes every N nodes (counts prunes)")
+parser.add_argument("--profile", metavar="FILE",
+                    help="backtrack: run the search under cProfile and save the stats to FILE")
+parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                    help="stop the search after SECONDS and save the best partial grid; "
+                         "--count-solutions stops counting after SECONDS too")
+parser.add_argument("--node-limit", type=int, metavar="N",
+                    help="backtrack: stop the search after N nodes and save the best partial "
+                         "grid; --count-solutions stops after N states too")
+args = parser.parse_args()
+
 # --- Step 0: Get the raw text ---
 # The first line will be the file name, 6.8.2 Carnes importadas for example
 # First to lines will be excluded
@@ -71,134 +96,13 @@ Cianocobalamina VITB12 µg 1 - 1 - 1 28.00 1 - 1 - 1 -
 Alimento crudo en peso neto P. comestible 50% P. comestible % P. comestible 51% P. comestible 80% P. comestible 100% P. comestible 51% P. comestible 51%
 """
 
-# --- Step 0a: Extract file name from the first line and remove the first two lines ---
-all_lines = raw_text.strip().splitlines()
-# First line will be used for naming the file.
-file_name_line = all_lines[0].strip()
-# Keep all lines except the first two and the last one.
-data_lines = all_lines[2:-1]
-# Rebuild raw_text from remaining lines.
-raw_text = "\n".join(data_lines)
-
-# --- Step 0b: Replace specific words with their correct forms ---
-replacements = {
-    "Fibra dietética": "Fibra_dietética",
-    "Hidratos de C": "Hidratos_de_C",
-    "Lípidos tot": "Lípidos_tot",
-    "RAE (vit A)": "RAE_(vit_A)",
-    "Ác. ascórbico": "Ác._ascórbico",
-    "Ác. fólico": "Ác._fólico"
-}
-for old, new in replacements.items():
-    raw_text = raw_text.replace(old, new)
-
-# --- Step 0c: Modify lines following any line that starts with "Energía ENERC" ---
-lines = raw_text.strip().splitlines()
-modified_lines = []
-i = 0
-while i < len(lines):
-    current_line = lines[i]
-    modified_lines.append(current_line)
-    if current_line.strip().startswith("Energía ENERC"):
-        if i + 1 < len(lines):
-            next_line = lines[i+1]
-            # If the next line doesn't already start with "Energía ENERC", prepend it.
-            if not next_line.strip().startswith("Energía ENERC"):
-                modified_lines.append("Energía ENERC " + next_line)
-                i += 2
-                continue
-    i += 1
-raw_text = "\n".join(modified_lines)
-
-# --- Step A: Split raw_text into lines ---
-lines = raw_text.strip().splitlines()
-
-# --- Step B: Process header block to extract food names ---
-# Get all non-empty lines between "Componente alimentario" and "Nutriente"
-header_lines = []
-capture = False
-for line in lines:
-    if "Componente alimentario" in line:
-        capture = True
-        # Remove "Componente alimentario" from the line if it is on the same line.
-        line = line.replace("Componente alimentario", "").strip()
-        if line:
-            header_lines.append(line)
-        continue
-    if "Nutriente" in line:
-        break
-    if capture and line.strip():
-        header_lines.append(line.strip())
-
-# In this raw text, each food appears on one line.
-food_count = len(header_lines)
-
-# Create extended headers: for each food, generate "[food] F" and "[food] en 100 g"
-final_headers = []
-for h in header_lines:
-    final_headers.append(h + " F")
-    final_headers.append(h + " en 100 g")
-
-# --- Step C: Build the full column headers ---
-# Four fixed columns plus 2 columns per food item.
-columns = ["Grupos", "Nutriente", "Tagname", "Unidad"] + final_headers
-
-# --- Step D: Process nutrient rows ---
-data_rows = []
-expected_pair_count = food_count * 2  # Expect 2 values per food
-
-# Find the starting index (the line after "Nutriente Tagname Unidad")
-start_index = next(i for i, line in enumerate(lines) if "Nutriente Tagname Unidad" in line) + 1
-
-# Define possible group names.
-group_names = ["Elementos principales", "elementos principales", "Ác. grasos", "Minerales", "Vitaminas"]
-current_group = None
-
-for line in lines[start_index:]:
-    line = line.strip()
-    if not line:
-        continue
-    if line in group_names:
-        current_group = line
-        continue
-
-    parts = line.split()
-    if len(parts) < 4:
-        continue
-
-    # The first three tokens are nutrient info.
-    nutrient = parts[0]
-    tagname = parts[1]
-    unit = parts[2]
-    raw_values = parts[3:]
-    
-    # Process raw_values:
-    # - If the count equals food_count, duplicate each value.
-    # - If it equals expected_pair_count, assume they are flag–value pairs.
-    # - Otherwise, try to pair them up.
-    if len(raw_values) == food_count:
-        processed_values = []
-        for v in raw_values:
-            processed_values.extend([v, v])
-    elif len(raw_values) == expected_pair_count:
-        processed_values = raw_values[:expected_pair_count]
-    else:
-        processed_values = []
-        i_val = 0
-        while i_val < len(raw_values) and len(processed_values) < expected_pair_count:
-            processed_values.append(raw_values[i_val])
-            if i_val + 1 < len(raw_values):
-                processed_values.append(raw_values[i_val+1])
-            i_val += 2
-
-    # Pad if needed
-    processed_values += [''] * (expected_pair_count - len(processed_values))
-    
-    row = [current_group, nutrient, tagname, unit] + processed_values
-    data_rows.append(row)
-
-# --- Step E: Create DataFrame and Export ---
-df = pd.DataFrame(data_rows, columns=columns)
+# --- Steps 0a–E: Parse the section (see section_parser.py) ---
+# The first line names the file, the first two lines and the last one are dropped.
+table = parse_section(raw_text)
+file_name_line = table.title
+final_headers = table.food_columns
+columns = table.columns
+df = table.to_frame()
 
 # ──────────────────────────────────────────────────────────────
 # 0️⃣  𝙶𝚛𝚘𝚞𝚙 𝚍𝚎𝚏𝚒𝚗𝚒𝚝𝚒𝚘𝚗 (row ➜ group)
@@ -245,10 +149,6 @@ for col in df.columns:
             except ValueError:
                 print("❌ Please enter a valid integer.")
 
-# Automatically calculate grand totals
-F_total_required = sum(v for k, v in col_blanks.items() if k.endswith(" F"))
-g100_total_required = sum(v for k, v in col_blanks.items() if k.endswith("en 100 g"))
-
 cols_only = [col for col in df.columns if col in col_blanks]
 original_values = {
     df.loc[i, "Nutriente"]: [v for v in df.loc[i, cols_only].values if pd.notna(v) and str(v).strip() != ""]
@@ -329,84 +229,74 @@ for col in sampled_cols:
 rows = list(row_blanks.keys())
 cols = list(col_blanks.keys())
 
-relevant_cols = [c for c, k in col_blanks.items() if k > 0]   # only columns that can contain blanks
-rc = len(relevant_cols)
-
-# pre-allocate helpers
-row_patterns, row_F, row_100, row_gc = {}, {}, {}, {}
-for r in rows:
-    need = row_blanks[r]
-    opts, f_cnt, g_cnt, gc_cnt = [], [], [], []
-    for mask in itertools.product([0, 1], repeat=rc):
-        pat = dict(zip(relevant_cols, mask))     # ← use relevant_cols
-
-        if sum(pat.values()) != need:
-            continue
-        # honour the individually-fixed blanks
-        if any(pat[col] == 0 for (row, col) in known_cells if row == r):
-            continue
-        opts.append(pat)
-        f_cnt.append(sum(v for c,v in pat.items() if c.endswith(" F")))
-        g_cnt.append(sum(v for c,v in pat.items() if c.endswith("en 100 g")))
-        gc_cnt.append({(row2group[r], c): v
-                       for c,v in pat.items()
-                       if (row2group[r], c) in group_col_req})
-    row_patterns[r], row_F[r], row_100[r], row_gc[r] = opts, f_cnt, g_cnt, gc_cnt
-
 # ──────────────────────────────────────────────────────────────
-# 4️⃣  Back-tracking with
+# 4️⃣  Search (see blank_solver.py) with
 #        • column totals
 #        • grand totals
 #        • group-column quotas
 # ──────────────────────────────────────────────────────────────
-targets     = {c: col_blanks[c] for c in relevant_cols}
-col_totals  = {c: 0 for c in relevant_cols}
-group_tot   = defaultdict(int)            # running (group,col) tally
-assignment  = {}
-solution    = None
-
-def backtrack(i, F_so_far, G_so_far):
-    global solution
-    if solution: return
-    if i == len(rows):
-        if (all(col_totals[c] == targets[c] for c in relevant_cols)
-                and F_so_far == F_total_required
-                and G_so_far == g100_total_required
-                and all(group_tot[key] == need
-                        for key, need in group_col_req.items())):
-            solution = assignment.copy()
-        return
-
-    r = rows[i]
-    for k, pat in enumerate(row_patterns[r]):
-        f_inc, g_inc = row_F[r][k], row_100[r][k]
-        # grand totals
-        if F_so_far + f_inc > F_total_required:    continue
-        if G_so_far + g_inc > g100_total_required: continue
-        # column totals
-        if any(col_totals[c] + pat[c] > targets[c] for c in relevant_cols):
-            continue
-        # group-column quotas
-        gc_inc = row_gc[r][k]
-        if any(group_tot[key] + v > group_col_req[key] for key, v in gc_inc.items()):
-            continue
-
-        # choose
-        assignment[r] = pat
-        for c in relevant_cols: col_totals[c] += pat[c]
-        for key, v in gc_inc.items(): group_tot[key] += v
-
-        backtrack(i + 1, F_so_far + f_inc, G_so_far + g_inc)
-
-        # undo
-        for c in relevant_cols: col_totals[c] -= pat[c]
-        for key, v in gc_inc.items(): group_tot[key] -= v
-        del assignment[r]
-
-backtrack(0, 0, 0)
-if solution is None:
+problem = BlankProblem(
+    rows=rows,
+    cols=cols,
+    row_blanks=row_blanks,
+    col_blanks=col_blanks,
+    row_groups=row2group,
+    group_col_req=group_col_req,
+    known_cells=known_cells,
+)
+if args.backend == "backtrack":
+    solver = BlankSolver(problem, ordering="mrv", memo_size=100_000, track_memory=args.stats,
+                         instrument=bool(args.stats or args.progress or args.profile),
+                         progress=log_progress if args.progress else None,
+                         progress_every=args.progress or 10_000, profile=args.profile or False,
+                         time_limit=args.time_limit, node_limit=args.node_limit)
+else:
+    solver = make_solver(problem, args.backend, time_limit=args.time_limit)
+solution = solver.solve()
+if args.backend == "backtrack" and solver.used_fast_path:
+    print("🧠  No group quotas: the blanks were placed by max-flow, without a search.")
+elif args.backend == "backtrack":
+    memo_line = (f"🧠  Dead-state memo: {solver.memo.hit_ratio:.1%} hits over {solver.memo.lookups} "
+                 f"lookups, {solver.memo.peak_entries} states at peak")
+    if args.stats:
+        peak = "n/a" if solver.peak_memory is None else f"{solver.peak_memory / 1024:.0f} KiB"
+        memo_line += f", {peak} peak memory"
+    print(memo_line)
+    print(f"🔎  Search: {solver.stats.summary()}")
+    if args.profile:
+        print(f"✅  Profile saved to {args.profile} (python -m pstats {args.profile})")
+partial = getattr(solver, "partial", None)
+if partial is not None:
+    print(f"⚠️  Search stopped at the {partial.reason}; saving the best partial grid.")
+    for line in partial.describe():
+        print(f"     • {line}")
+    solution = partial.grid
+elif solution is None and getattr(solver, "status", None) == "time limit":
+    raise RuntimeError("❌  Time limit reached before an answer; no grid saved.")
+elif solution is None:
     raise RuntimeError("❌  No grid satisfies all constraints.")
 
+if args.count_solutions and partial is None:
+    counted = BlankSolver(problem, time_limit=args.time_limit,
+                          node_limit=args.node_limit).count(workers=args.workers)
+    if not counted.complete:
+        print(f"⚠️  Count stopped at the {counted.status}; no blank shares saved.")
+    else:
+        print(f"🔢  {counted.total} grid(s) satisfy all constraints.")
+
+        certainty = pd.DataFrame.from_dict(counted.blank_share, orient="index")
+        certainty.insert(0, "Group", [row2group[r] for r in certainty.index])
+        certainty.to_excel("blank_certainty.xlsx", index=True)
+        print("✅  Blank shares saved to blank_certainty.xlsx")
+
+        uncertain = counted.uncertain_cells()
+        if uncertain:
+            print(f"⚠️  {len(uncertain)} cell(s) are not fixed by the constraints:")
+            for r, c in uncertain:
+                print(f"     • {r} / {c}: blank in {counted.blank_share[r][c]:.0%} of grids")
+        else:
+            print("✅  The grid is uniquely determined.")
+
 # ──────────────────────────────────────────────────────────────
 # 5️⃣  Build DataFrame with a “Group” column & save
 # ──────────────────────────────────────────────────────────────
@@ -459,6 +349,8 @@ skipped_rows = skipped_rows[ordered_columns]
 final_df = pd.concat([skipped_rows, final_df], axis=0)
 
 # Save to Excel
-final_df.to_excel("final_grid_2.xlsx", index=True)
-print("✅  Grid saved to final_grid_2.xlsx")
+# a partial grid never overwrites a real solution
+out_name = "final_grid_2.xlsx" if partial is None else "final_grid_2.partial.xlsx"
+final_df.to_excel(out_name, index=True)
+print(f"✅  Grid saved to {out_name}")
 
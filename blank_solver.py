@@ -0,0 +1,1072 @@
+#!/usr/bin/env python3
+"""
+Reusable blank-grid solver (the engine behind `blank tables ready V5.py`).
+
+A grid is valid when
+
+  • every row has exactly row_blanks[r] blanks
+  • every column has exactly col_blanks[c] blanks
+  • the “… F” and “… en 100 g” columns add up to their grand totals
+  • every (group, column) quota in group_col_req is met
+  • every cell in known_cells is a blank
+
+Row patterns are generated with combinations() over the columns that can
+still hold a blank, and the search keeps running column / group remainders
+so a branch is cut as soon as the rows left cannot fill a deficit.
+Patterns are stored as int bitmasks plus uint8 slot vectors and the running
+tallies as one NumPy array, so feasibility is a single vector comparison.
+Problems without group quotas skip the search and are solved as a
+bipartite max-flow.  PortfolioSolver races several search orderings on a
+process pool and keeps the first answer; count(workers=N) splits the
+enumeration of every grid into subtrees counted on a process pool.
+"""
+
+import cProfile
+import multiprocessing as mp
+import os
+import pstats
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from itertools import combinations
+
+import numpy as np
+
+# bump when the grids returned for a problem change (invalidates build caches)
+SOLVER_VERSION = 1
+
+
+# ──────────────────────────────────────────────────────────────
+#     Problem definition
+# ──────────────────────────────────────────────────────────────
+@dataclass
+class BlankProblem:
+    rows: list                                   # nutrient names, in table order
+    cols: list                                   # every “ F” / “en 100 g” column
+    row_blanks: dict                             # row ➜ number of blanks
+    col_blanks: dict                             # column ➜ number of blanks
+    row_groups: dict = field(default_factory=dict)      # row ➜ group name
+    group_col_req: dict = field(default_factory=dict)   # (group, column) ➜ blanks
+    known_cells: set = field(default_factory=set)       # {(row, column)} fixed blanks
+
+    @property
+    def relevant_cols(self):
+        """Columns that can contain blanks at all."""
+        return [c for c in self.cols if self.col_blanks.get(c, 0) > 0]
+
+    @property
+    def F_total(self):
+        return sum(v for c, v in self.col_blanks.items() if c.endswith(" F"))
+
+    @property
+    def g100_total(self):
+        return sum(v for c, v in self.col_blanks.items() if c.endswith("en 100 g"))
+
+
+def check_grid(problem, grid):
+    """
+    The constraints a grid ({row: {column: 0/1}}, missing cells = 0) breaks,
+    as readable strings; an empty list means the grid is valid.
+    """
+    def cell(r, c):
+        return grid.get(r, {}).get(c, 0)
+
+    errors = []
+    for r in problem.rows:
+        got = sum(cell(r, c) for c in problem.cols)
+        if got != problem.row_blanks[r]:
+            errors.append(f"row '{r}': {got} blanks, needs {problem.row_blanks[r]}")
+    for c in problem.cols:
+        got = sum(cell(r, c) for r in problem.rows)
+        if got != problem.col_blanks.get(c, 0):
+            errors.append(f"column '{c}': {got} blanks, needs {problem.col_blanks.get(c, 0)}")
+    for (group, c), need in problem.group_col_req.items():
+        got = sum(cell(r, c) for r in problem.rows if problem.row_groups.get(r) == group)
+        if got != need:
+            errors.append(f"group '{group}' in '{c}': {got} blanks, needs {need}")
+    for r, c in sorted(problem.known_cells):
+        if not cell(r, c):
+            errors.append(f"known blank ('{r}', '{c}') is not blank")
+    return errors
+
+
+def row_patterns(problem, r):
+    """
+    Every way of placing row r's blanks, as tuples of columns.
+
+    Only combinations of the columns that may hold a blank for this row are
+    generated: known cells are always included, and columns whose
+    (group, column) quota is zero for the row's group are never used.
+    """
+    relevant = problem.relevant_cols
+    need = problem.row_blanks[r]
+    group = problem.row_groups.get(r)
+
+    forced = [c for c in relevant if (r, c) in problem.known_cells]
+    if any((r, c) in problem.known_cells for c in problem.cols if c not in relevant):
+        return []                                # a known blank in a 0-blank column
+    free = [c for c in relevant
+            if c not in forced and problem.group_col_req.get((group, c)) != 0]
+    if any(problem.group_col_req.get((group, c)) == 0 for c in forced):
+        return []
+
+    k = need - len(forced)
+    if k < 0 or k > len(free):
+        return []
+    return [tuple(sorted(forced + list(extra), key=relevant.index))
+            for extra in combinations(free, k)]
+
+
+@dataclass
+class SolutionCount:
+    """
+    What BlankSolver.count() found.  When the count ran out of budget,
+    status names the limit ("time limit", "node limit" or "state limit"),
+    total is None and blank_share is empty.
+    """
+    total: int                                   # number of valid grids
+    blank_share: dict                            # row ➜ {column ➜ share of grids with a blank}
+    status: str = "counted"
+
+    @property
+    def complete(self):
+        return self.status == "counted"
+
+    def uncertain_cells(self):
+        """(row, column) cells that are blank in some grids but not all."""
+        return [(r, c) for r, shares in self.blank_share.items()
+                for c, share in shares.items() if 0 < share < 1]
+
+
+class DeadStateMemo:
+    """
+    LRU-bounded set of search states known to have no completion.
+
+    A state is (rows already placed, remaining tallies); the tallies cover the
+    column totals, the F / en 100 g grand totals and the group quotas, so two
+    branches that reach the same state can share the failure.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._states = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.peak_entries = 0
+
+    def __contains__(self, state):
+        self.lookups += 1
+        if state in self._states:
+            self._states.move_to_end(state)
+            self.hits += 1
+            return True
+        return False
+
+    def __len__(self):
+        return len(self._states)
+
+    def add(self, state):
+        self._states[state] = None
+        if len(self._states) > self.maxsize:
+            self._states.popitem(last=False)
+            self.evictions += 1
+        self.peak_entries = max(self.peak_entries, len(self._states))
+
+    @property
+    def hit_ratio(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+# slot kind ➜ prune reason; "memo" counts states skipped as known dead ends
+PRUNE_REASONS = ("column", "grand total", "group quota", "memo")
+
+
+@dataclass
+class SearchStats:
+    """
+    What one BlankSolver.solve() did.
+
+    nodes / max_depth are always kept.  With instrument=True the solver
+    also fills prunes (reason ➜ patterns or states cut), depth_nodes and
+    depth_seconds: the time from entering a node at depth d to entering
+    the next node, so it covers the checks and the undo work of depth d.
+    """
+    rows: int = 0                                # depth of a full grid
+    nodes: int = 0
+    max_depth: int = 0
+    prunes: Counter = field(default_factory=Counter)
+    depth_nodes: list = field(default_factory=list)
+    depth_seconds: list = field(default_factory=list)
+    started: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def elapsed(self):
+        return self.seconds or time.perf_counter() - self.started
+
+    def summary(self):
+        """One log line: nodes, depth, elapsed time and the prunes by reason."""
+        line = (f"{self.nodes:,} nodes, depth {self.max_depth}/{self.rows}, "
+                f"{self.elapsed:.2f} s")
+        if self.prunes:
+            line += ", prunes: " + ", ".join(f"{reason} {n:,}"
+                                             for reason, n in self.prunes.most_common())
+        return line
+
+    def slowest_depths(self, n=5):
+        """(depth, seconds, nodes) of the n depths that took the most time."""
+        depths = sorted(range(len(self.depth_seconds)), key=lambda d: -self.depth_seconds[d])
+        return [(d, self.depth_seconds[d], self.depth_nodes[d]) for d in depths[:n]
+                if self.depth_nodes[d]]
+
+
+def log_progress(stats):
+    """A progress callback for BlankSolver that prints SearchStats.summary()."""
+    print(f"⏳  {stats.summary()}", flush=True)
+
+
+@dataclass
+class PartialGrid:
+    """The deepest assignment a search reached before running out of budget."""
+    reason: str                                  # "time limit", "node limit" or "cancelled"
+    grid: dict                                   # placed rows only: {row: {column: 0/1}}
+    missing_rows: dict                           # unplaced row ➜ blanks it needs
+    missing_cols: dict                           # column ➜ blanks still to place
+    missing_quotas: dict                         # (group, column) ➜ blanks still to place
+
+    def describe(self):
+        """Readable lines: what is placed and which rows / columns / quotas are left."""
+        placed = len(self.grid)
+        lines = [f"{self.reason}: {placed}/{placed + len(self.missing_rows)} rows placed"]
+        if self.missing_rows:
+            lines.append("rows left: " + ", ".join(f"{r} ({n})"
+                                                   for r, n in self.missing_rows.items()))
+        if self.missing_cols:
+            lines.append("columns short: " + ", ".join(f"{c} ({n})"
+                                                       for c, n in self.missing_cols.items()))
+        if self.missing_quotas:
+            lines.append("group quotas short: " + ", ".join(
+                f"{group} / {c} ({n})" for (group, c), n in self.missing_quotas.items()))
+        return lines
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+# ──────────────────────────────────────────────────────────────
+#     Search engine
+# ──────────────────────────────────────────────────────────────
+class BlankSolver:
+    """
+    Depth-first search over row patterns.
+
+    Each pattern is kept twice: as an int bitmask over the relevant columns
+    (bit j ⇔ relevant_cols[j] is blank) and as a uint8 row of a per-row
+    matrix over the *slots* of the problem:
+
+        [ relevant columns … | F total | en 100 g total | (group, col) quotas … ]
+
+    The remaining capacity of every slot lives in one int array, so checking
+    all patterns of a row is a single `(vectors <= left).all(axis=1)`.
+
+    ordering="input" visits the rows in table order (as V5 did) and checks
+    the remaining rows against a precomputed suffix cover.  ordering="mrv"
+    branches on the row with the fewest surviving patterns first, and before
+    every branch checks that the remaining rows' best surviving patterns can
+    still reach each column target and each group_col_req quota.
+
+    memo_size > 0 turns the search into a DP over dead states: every state
+    that failed is kept in a DeadStateMemo of that many entries and skipped
+    when it is reached again.  With track_memory=True, solve() records the
+    peak traced allocation in peak_memory (bytes).
+
+    `stats` (SearchStats) describes the last solve(): nodes visited and the
+    deepest row reached, and with instrument=True the prunes by constraint
+    type (column totals, F / en 100 g grand totals, group quotas, memo) and
+    the time spent per depth.  progress(stats) is called every
+    progress_every nodes (log_progress prints a line).  profile=True runs
+    solve() under cProfile and keeps the pstats.Stats in profile_stats; a
+    file name also dumps them there.
+
+    time_limit (seconds) and node_limit bound the search.  When one runs out,
+    solve() returns None with status "time limit" / "node limit" and keeps
+    the deepest assignment reached in `partial` (a PartialGrid listing the
+    rows, columns and quotas still unsatisfied); otherwise status is
+    "solved" or "infeasible".  count() honours the same two limits.
+
+    seed (an int) shuffles the order in which each row's patterns are
+    tried and, with ordering="input", the row order as well; the grids
+    found differ, the set of valid grids does not.
+
+    When the problem has no group_col_req, solve() skips the search and
+    builds the grid with FlowBlankSolver (used_fast_path is then True);
+    fast_path=False forces the search.
+
+    solve() returns {row: {column: 0/1}} for the first valid grid (only the
+    relevant columns are listed, as in V5), or None when no grid exists.
+    count() enumerates every valid grid instead; see SolutionCount.
+    """
+
+    ORDERINGS = ("input", "mrv")
+
+    def __init__(self, problem, ordering="input", memo_size=0, track_memory=False,
+                 fast_path=True, instrument=False, progress=None, progress_every=10_000,
+                 profile=False, time_limit=None, node_limit=None, seed=None):
+        if ordering not in self.ORDERINGS:
+            raise ValueError(f"Unknown ordering '{ordering}', expected one of {self.ORDERINGS}")
+        self.problem = problem
+        self.ordering = ordering
+        self.memo = DeadStateMemo(memo_size) if memo_size > 0 else None
+        self.track_memory = track_memory
+        self.peak_memory = None
+        self.instrument = instrument
+        self.progress = progress
+        self.progress_every = progress_every
+        self.profile = profile
+        self.profile_stats = None
+        self.stats = SearchStats()
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.status = None
+        self.partial = None
+        self.seed = seed
+        self.rows = list(problem.rows)
+        if seed is not None and ordering == "input":
+            np.random.default_rng(seed).shuffle(self.rows)
+        self.row_bit = {r: 1 << i for i, r in enumerate(self.rows)}
+        self.relevant_cols = problem.relevant_cols
+        self.quota_keys = list(problem.group_col_req)
+        self.fast_path = fast_path
+        self.used_fast_path = False
+        self._tables_built = False
+
+    def _build_tables(self):
+        """Row patterns, slot vectors and suffix covers (built on first use)."""
+        if self._tables_built:
+            return
+        self._tables_built = True
+        problem = self.problem
+        cindex = {c: j for j, c in enumerate(self.relevant_cols)}
+        n_cols = len(self.relevant_cols)
+        qindex = {key: n_cols + 2 + q for q, key in enumerate(self.quota_keys)}
+        self.slots = (self.relevant_cols + ["F total", "en 100 g total"]
+                      + self.quota_keys)
+        self.slot_reason = np.array([0] * n_cols + [1, 1] + [2] * len(self.quota_keys))
+        self.target = np.array(
+            [problem.col_blanks[c] for c in self.relevant_cols]
+            + [problem.F_total, problem.g100_total]
+            + [problem.group_col_req[k] for k in self.quota_keys],
+            dtype=np.int64,
+        )
+
+        # per row: bitmasks and the matching slot matrix
+        self.masks, self.vectors = {}, {}
+        for r in self.rows:
+            group = problem.row_groups.get(r)
+            pats = row_patterns(problem, r)
+            vecs = np.zeros((len(pats), len(self.slots)), dtype=np.uint8)
+            masks = []
+            for k, pat in enumerate(pats):
+                mask = 0
+                for c in pat:
+                    j = cindex[c]
+                    mask |= 1 << j
+                    vecs[k, j] = 1
+                    vecs[k, n_cols if c.endswith(" F") else n_cols + 1] += 1
+                    if (group, c) in qindex:
+                        vecs[k, qindex[group, c]] = 1
+                masks.append(mask)
+            self.masks[r], self.vectors[r] = masks, vecs
+
+        if self.seed is not None:                # value ordering of this portfolio member
+            rng = np.random.default_rng(self.seed)
+            for r in self.rows:
+                order = rng.permutation(len(self.masks[r]))
+                self.masks[r] = [self.masks[r][k] for k in order]
+                self.vectors[r] = self.vectors[r][order]
+
+        # cover[i]: the most rows[i:] can still add to every slot
+        n = len(self.rows)
+        self.cover = np.zeros((n + 1, len(self.slots)), dtype=np.int64)
+        for i in range(n - 1, -1, -1):
+            vecs = self.vectors[self.rows[i]]
+            best = vecs.max(axis=0) if len(vecs) else 0
+            self.cover[i] = self.cover[i + 1] + best
+
+    # ──────────────────────────────────────────────────────────
+    def _feasible_start(self):
+        if any(not self.masks[r] for r in self.rows):
+            return False
+        p = self.problem
+        if sum(p.row_blanks[r] for r in self.rows) != sum(
+                p.col_blanks[c] for c in self.relevant_cols):
+            return False
+        return self._can_finish(0)
+
+    def _can_finish(self, i):
+        """Can rows[i:] still fill every column and group deficit?"""
+        short = self.left > self.cover[i]
+        if not short.any():
+            return True
+        if self.instrument:
+            self._prune(short)
+        return False
+
+    # ──────────────────────────────────────────────────────────
+    @property
+    def nodes(self):
+        return self.stats.nodes
+
+    def _visit(self, depth):
+        """Count a node at `depth` (rows placed); time / progress bookkeeping."""
+        stats = self.stats
+        if self.node_limit is not None and stats.nodes >= self.node_limit:
+            raise _OutOfBudget("node limit")
+        stats.nodes += 1
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+            self._best = dict(self.assignment)
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _OutOfBudget("time limit")
+        if self.instrument:
+            now = time.perf_counter()
+            stats.depth_seconds[self._depth] += now - self._since
+            stats.depth_nodes[depth] += 1
+            self._depth, self._since = depth, now
+        if self.progress is not None and stats.nodes % self.progress_every == 0:
+            self.progress(stats)
+
+    def _prune(self, over, reason=None):
+        """Count cuts; `over` marks the exceeded slots (one row per cut pattern)."""
+        if reason is not None:
+            self.stats.prunes[reason] += 1
+            return
+        first = np.atleast_2d(over).argmax(axis=1)
+        for code, n in enumerate(np.bincount(self.slot_reason[first], minlength=3)):
+            if n:
+                self.stats.prunes[PRUNE_REASONS[code]] += int(n)
+
+    def _fitting(self, vecs, left):
+        """Indices of the patterns that fit in `left` (the rest are counted as prunes)."""
+        fits = vecs <= left
+        ok = fits.all(axis=1)
+        if self.instrument and not ok.all():
+            self._prune(~fits[~ok])
+        return np.flatnonzero(ok)
+
+    def _partial(self, reason):
+        """The PartialGrid of the deepest assignment reached."""
+        p = self.problem
+        grid = self._as_grid(self._best)
+        placed = {c: sum(grid[r][c] for r in grid) for c in self.relevant_cols}
+        missing_cols = {c: p.col_blanks[c] - placed[c] for c in self.relevant_cols
+                        if placed[c] != p.col_blanks[c]}
+        missing_quotas = {}
+        for (group, c), need in p.group_col_req.items():
+            got = sum(grid[r].get(c, 0) for r in grid if p.row_groups.get(r) == group)
+            if got != need:
+                missing_quotas[group, c] = need - got
+        return PartialGrid(reason=reason, grid=grid,
+                           missing_rows={r: p.row_blanks[r] for r in self.rows if r not in grid},
+                           missing_cols=missing_cols, missing_quotas=missing_quotas)
+
+    def solve(self):
+        self.partial = None
+        if self.fast_path and not self.problem.group_col_req:
+            self.used_fast_path = True
+            grid = FlowBlankSolver(self.problem).solve()
+            self.status = "infeasible" if grid is None else "solved"
+            return grid
+
+        self._build_tables()
+        self.left = self.target.copy()
+        self.assignment = {}
+        self._best = {}
+        n = len(self.rows)
+        self.stats = SearchStats(rows=n, started=time.perf_counter())
+        self._deadline = (None if self.time_limit is None
+                          else self.stats.started + self.time_limit)
+        if self.instrument:
+            self.stats.depth_nodes = [0] * (n + 1)
+            self.stats.depth_seconds = [0.0] * (n + 1)
+            self._depth, self._since = 0, self.stats.started
+        self.status = "infeasible"
+        if not self._feasible_start():
+            self.stats.seconds = time.perf_counter() - self.stats.started
+            return None
+
+        profiler = cProfile.Profile() if self.profile else None
+        if self.track_memory:
+            tracemalloc.start()
+        if profiler:
+            profiler.enable()
+        try:
+            if self.ordering == "mrv":
+                found = self._backtrack_mrv(list(self.rows), 0)
+            else:
+                found = self._backtrack(0)
+        except _OutOfBudget as exc:
+            found = False
+            self.status = str(exc)
+            self.partial = self._partial(self.status)
+        finally:
+            if profiler:
+                profiler.disable()
+                self.profile_stats = pstats.Stats(profiler)
+                if isinstance(self.profile, str):
+                    profiler.dump_stats(self.profile)
+            if self.track_memory:
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            now = time.perf_counter()
+            if self.instrument:
+                self.stats.depth_seconds[self._depth] += now - self._since
+            self.stats.seconds = now - self.stats.started
+        if found:
+            self.status = "solved"
+        return self._as_grid(self.assignment) if found else None
+
+    # count(): most (row, remaining tallies) states memoized per process, ~250 bytes each
+    COUNT_MAX_STATES = 500_000
+
+    def count(self, workers=1, split_rows=None, max_states=COUNT_MAX_STATES):
+        """
+        Count every valid grid and the share of them in which each cell is blank.
+
+        The rows are taken in table order and the number of ways to finish
+        from row i is memoized on (i, remaining tallies), so grids that only
+        differ in earlier rows share all the work below them.  A forward pass
+        over the same states then spreads the counts over the cells.
+
+        workers > 1 splits the search tree: the distinct states after the
+        first split_rows rows (by default, enough rows for four states per
+        worker) are counted as independent subtrees on a process pool, one
+        task each, and the counts and per-cell tallies are merged back.
+
+        The count stops once it has expanded node_limit states, run for
+        time_limit seconds or memoized max_states states (None: no cap); with
+        workers > 1 the limits apply to each worker.  It then returns a
+        SolutionCount with that status and no total.
+        """
+        self._build_tables()
+        self._start_count(max_states)
+        self.left = self.target.copy()
+        try:
+            if not self._feasible_start():
+                total, tally = 0, {r: [0] * len(self.relevant_cols) for r in self.rows}
+            elif workers > 1:
+                total, tally = self._count_split(workers, split_rows, max_states)
+            else:
+                total, tally = self._suffix_count(0, self.target, {})
+        except _OutOfBudget as exc:
+            return SolutionCount(total=None, blank_share={}, status=str(exc))
+        finally:
+            self.stats.seconds = time.perf_counter() - self.stats.started
+
+        share = {r: {c: (tally[r][j] / total if total else 0.0)
+                     for j, c in enumerate(self.relevant_cols)}
+                 for r in self.rows}
+        return SolutionCount(total=total, blank_share=share)
+
+    def _start_count(self, max_states):
+        self.stats = SearchStats(rows=len(self.rows), started=time.perf_counter())
+        self._deadline = (None if self.time_limit is None
+                          else self.stats.started + self.time_limit)
+        self.max_states = max_states
+
+    def _count_visit(self, memo):
+        """Count one new state of count(); raise _OutOfBudget past a limit."""
+        stats = self.stats
+        if self.node_limit is not None and stats.nodes >= self.node_limit:
+            raise _OutOfBudget("node limit")
+        stats.nodes += 1
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _OutOfBudget("time limit")
+        if self.max_states is not None and len(memo) >= self.max_states:
+            raise _OutOfBudget("state limit")
+
+    def _suffix_count(self, start, left, memo):
+        """(grids, row ➜ per-column blank tallies) of rows[start:] from the tallies `left`."""
+        self.left = left.copy()
+        total = self._count(start, memo)
+        tally = {r: [0] * len(self.relevant_cols) for r in self.rows[start:]}
+        level = {left.tobytes(): (1, left)}
+        for i in range(start, len(self.rows)):
+            if not total:
+                break
+            level = self._spread(i, level, memo, tally)
+        return total, tally
+
+    def _spread(self, i, level, below, tally):
+        """
+        One forward step: every state of `level` (key ➜ (ways in, tallies)) through
+        the patterns of rows[i], adding ways × completions to the row's tally.
+        """
+        r = self.rows[i]
+        vecs, masks, row_tally = self.vectors[r], self.masks[r], tally[r]
+        nxt = {}
+        for ways, left in level.values():
+            for k in np.flatnonzero((vecs <= left).all(axis=1)):
+                after = left - vecs[k]
+                key = after.tobytes()
+                finish = below.get((i + 1, key), 0)
+                if not finish:
+                    continue
+                grids = ways * finish
+                mask = masks[k]
+                for j in range(len(row_tally)):
+                    if mask >> j & 1:
+                        row_tally[j] += grids
+                seen = nxt.get(key)
+                nxt[key] = (ways + (seen[0] if seen else 0), after)
+        return nxt
+
+    def _split_levels(self, workers, split_rows):
+        """The distinct live states after each of the first rows: [{key: tallies}, …]."""
+        levels = [{self.target.tobytes(): self.target}]
+        while len(levels) <= len(self.rows):
+            i = len(levels) - 1
+            if split_rows is not None and i >= split_rows:
+                break
+            if split_rows is None and len(levels[-1]) >= 4 * workers:
+                break
+            vecs, nxt = self.vectors[self.rows[i]], {}
+            for left in levels[-1].values():
+                for k in np.flatnonzero((vecs <= left).all(axis=1)):
+                    after = left - vecs[k]
+                    if (after <= self.cover[i + 1]).all():
+                        nxt[after.tobytes()] = after
+            levels.append(nxt)
+        return levels
+
+    def _count_split(self, workers, split_rows, max_states):
+        levels = self._split_levels(workers, split_rows)
+        depth = len(levels) - 1
+        frontier = levels[depth]
+
+        # one task per subtree; idle workers pick up the next one
+        below, subtrees = {}, {}
+        budget = (self.time_limit, self.node_limit, max_states)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_count_worker_init,
+                                 initargs=(self.problem, self.ordering, self.seed, budget)) as pool:
+            futures = {pool.submit(_count_subtree, depth, left): key
+                       for key, left in frontier.items()}
+            try:
+                for future in as_completed(futures):
+                    key = futures[future]
+                    below[depth, key], subtrees[key] = future.result()
+            except _OutOfBudget:
+                pool.shutdown(cancel_futures=True)       # running subtrees stop at their own limits
+                raise
+
+        # completions of the states above the split, then the forward pass through them
+        for i in range(depth - 1, -1, -1):
+            vecs = self.vectors[self.rows[i]]
+            for key, left in levels[i].items():
+                below[i, key] = sum(below.get((i + 1, (left - vecs[k]).tobytes()), 0)
+                                    for k in np.flatnonzero((vecs <= left).all(axis=1)))
+        total = below[0, self.target.tobytes()]
+        tally = {r: [0] * len(self.relevant_cols) for r in self.rows}
+        level = {self.target.tobytes(): (1, self.target)}
+        for i in range(depth):
+            level = self._spread(i, level, below, tally)
+        for key, (ways, _) in level.items():
+            for r, counts in subtrees[key].items():
+                row_tally = tally[r]
+                for j, n in enumerate(counts):
+                    row_tally[j] += ways * n
+        return total, tally
+
+    def _count(self, i, memo):
+        key = (i, self.left.tobytes())
+        if key in memo:
+            return memo[key]
+        self._count_visit(memo)
+        if i == len(self.rows):
+            memo[key] = 0 if self.left.any() else 1
+            return memo[key]
+
+        r = self.rows[i]
+        vecs, left = self.vectors[r], self.left
+        ways = 0
+        for k in np.flatnonzero((vecs <= left).all(axis=1)):
+            vec = vecs[k]
+            left -= vec
+            if self._can_finish(i + 1):
+                ways += self._count(i + 1, memo)
+            left += vec
+        memo[key] = ways
+        return ways
+
+    def _as_grid(self, assignment):
+        """{row: {column: 0/1}} of the assigned rows, in table order."""
+        return {r: {c: (assignment[r] >> j) & 1 for j, c in enumerate(self.relevant_cols)}
+                for r in self.problem.rows if r in assignment}
+
+    def _backtrack(self, i):
+        self._visit(i)
+        if i == len(self.rows):
+            return not self.left.any()
+        state = (i, self.left.tobytes())
+        if self.memo is not None and state in self.memo:
+            if self.instrument:
+                self._prune(None, "memo")
+            return False
+
+        r = self.rows[i]
+        vecs, masks, left = self.vectors[r], self.masks[r], self.left
+        for k in self._fitting(vecs, left):
+            vec = vecs[k]
+            left -= vec                                   # choose
+            self.assignment[r] = masks[k]
+
+            if self._can_finish(i + 1) and self._backtrack(i + 1):
+                return True
+
+            del self.assignment[r]                        # undo
+            left += vec
+
+        if self.memo is not None:
+            self.memo.add(state)
+        return False
+
+    def _backtrack_mrv(self, todo, done):
+        self._visit(len(self.rows) - len(todo))
+        if not todo:
+            return not self.left.any()
+        state = (done, self.left.tobytes())
+        if self.memo is not None and state in self.memo:
+            if self.instrument:
+                self._prune(None, "memo")
+            return False
+        if not self._branch_mrv(todo, done):
+            if self.memo is not None:
+                self.memo.add(state)
+            return False
+        return True
+
+    def _branch_mrv(self, todo, done):
+
+        # surviving patterns of every row that is still open
+        left = self.left
+        surviving = []
+        reach = np.zeros_like(left)            # most the open rows can still add
+        floor = np.zeros_like(left)            # least they will add
+        for r in todo:
+            vecs = self.vectors[r]
+            ok = self._fitting(vecs, left)
+            if len(ok) == 0:
+                return False
+            surviving.append(ok)
+            reach += vecs[ok].max(axis=0)
+            floor += vecs[ok].min(axis=0)
+        bounds = (left > reach) | (left < floor)
+        if bounds.any():
+            if self.instrument:
+                self._prune(bounds)
+            return False
+
+        # branch on the most constrained row
+        pick = min(range(len(todo)), key=lambda t: len(surviving[t]))
+        r = todo[pick]
+        rest = todo[:pick] + todo[pick + 1:]
+        vecs, masks = self.vectors[r], self.masks[r]
+        for k in surviving[pick]:
+            vec = vecs[k]
+            left -= vec
+            self.assignment[r] = masks[k]
+
+            if self._backtrack_mrv(rest, done | self.row_bit[r]):
+                return True
+
+            del self.assignment[r]
+            left += vec
+        return False
+
+
+# per-process solver of the count() pool; its memo is kept across subtrees
+_count_worker = {}
+
+
+def _count_worker_init(problem, ordering, seed, budget):
+    # same ordering and seed as the parent, so the rows come in the same order
+    time_limit, node_limit, max_states = budget
+    solver = BlankSolver(problem, ordering=ordering, seed=seed,
+                         time_limit=time_limit, node_limit=node_limit)
+    solver._build_tables()
+    solver._start_count(max_states)
+    _count_worker["solver"] = solver
+    _count_worker["memo"] = {}
+
+
+def _count_subtree(start, left):
+    """(grids, per-row tallies) below one split state, counted in a pool worker."""
+    return _count_worker["solver"]._suffix_count(start, left, _count_worker["memo"])
+
+
+# ──────────────────────────────────────────────────────────────
+#     Portfolio: several orderings in parallel
+# ──────────────────────────────────────────────────────────────
+def portfolio_configs(n):
+    """
+    BlankSolver options for n portfolio members: V5's MRV + memo, table
+    order, then seeded shuffles alternating MRV and row order.
+    """
+    configs = [dict(ordering="mrv", memo_size=100_000), dict(ordering="input")]
+    seed = 1
+    while len(configs) < n:
+        configs.append(dict(ordering="mrv", memo_size=100_000, seed=seed))
+        if len(configs) < n:
+            configs.append(dict(ordering="input", seed=seed))
+        seed += 1
+    return configs[:n]
+
+
+def _portfolio_member(problem, config, stop, time_limit, node_limit, check_every):
+    def check(stats):
+        if stop.is_set():
+            raise _OutOfBudget("cancelled")
+
+    solver = BlankSolver(problem, fast_path=False, time_limit=time_limit, node_limit=node_limit,
+                         progress=check, progress_every=check_every, **config)
+    grid = solver.solve()
+    return {"config": config, "status": solver.status, "grid": grid, "partial": solver.partial,
+            "nodes": solver.nodes, "seconds": solver.stats.seconds}
+
+
+class PortfolioSolver:
+    """
+    Race BlankSolver configurations on a process pool; keep the first answer.
+
+    Backtracking time swings widely with the row and pattern order, so the
+    same problem is searched by `workers` members at once (configs, default
+    portfolio_configs(workers)).  The first member to finish decides: a grid
+    is the answer, and since every member searches the whole tree, a member
+    that exhausts it proves that no grid exists.  The other members are then
+    cancelled: queued ones never start, running ones see the stop flag
+    within check_every nodes.
+
+    time_limit / node_limit apply to every member; when all of them run out,
+    solve() returns None and `partial` is the deepest PartialGrid found.
+    `winner` is the configuration that answered and `results` lists what
+    each finished member returned (status, nodes, seconds).
+
+    solve() has the same contract as BlankSolver.solve().
+    """
+
+    def __init__(self, problem, workers=None, configs=None, time_limit=None, node_limit=None,
+                 check_every=200):
+        self.problem = problem
+        self.workers = workers or os.cpu_count() or 1
+        self.configs = configs or portfolio_configs(self.workers)
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.check_every = check_every
+        self.status = None
+        self.partial = None
+        self.winner = None
+        self.results = []
+
+    def solve(self):
+        self.partial, self.winner, self.results = None, None, []
+        if not self.problem.group_col_req:
+            grid = FlowBlankSolver(self.problem).solve()
+            self.status = "infeasible" if grid is None else "solved"
+            return grid
+
+        answer = None
+        with mp.Manager() as manager:
+            stop = manager.Event()
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(self.configs))) as pool:
+                pending = {pool.submit(_portfolio_member, self.problem, config, stop,
+                                       self.time_limit, self.node_limit, self.check_every)
+                           for config in self.configs}
+                while pending and answer is None:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        self.results.append(result)
+                        if answer is None and result["status"] in ("solved", "infeasible"):
+                            answer = result
+                stop.set()
+                for future in pending:
+                    future.cancel()
+            # members still running when the flag was set
+            self.results += [f.result() for f in pending if not f.cancelled()]
+
+        if answer is not None:
+            self.status, self.winner = answer["status"], answer["config"]
+            return answer["grid"]
+        partials = [r["partial"] for r in self.results if r["partial"] is not None]
+        self.partial = max(partials, key=lambda p: len(p.grid), default=None)
+        self.status = self.partial.reason if self.partial else "cancelled"
+        return None
+
+
+# ──────────────────────────────────────────────────────────────
+#     Max-flow fast path (no group quotas)
+# ──────────────────────────────────────────────────────────────
+class FlowBlankSolver:
+    """
+    Degree-sequence realization for problems without group_col_req.
+
+    Without quotas the grid is a bipartite graph with the row blank counts
+    on one side and the column blank counts on the other.  Known cells are
+    forced edges; every other relevant cell is an edge of capacity 1, and
+    the blanks are placed by augmenting paths (max-flow), in polynomial
+    time.  The F / en 100 g grand totals follow from the column totals.
+
+    solve() has the same contract as BlankSolver.solve().
+    """
+
+    def __init__(self, problem):
+        if problem.group_col_req:
+            raise ValueError("FlowBlankSolver does not handle group_col_req; use BlankSolver")
+        self.problem = problem
+
+    def solve(self):
+        p = self.problem
+        relevant = p.relevant_cols
+        if any(c not in relevant for (_, c) in p.known_cells):
+            return None
+
+        x = {(r, c): int((r, c) in p.known_cells) for r in p.rows for c in relevant}
+        self.row_left = {r: p.row_blanks[r] - sum(x[r, c] for c in relevant) for r in p.rows}
+        self.col_left = {c: p.col_blanks[c] - sum(x[r, c] for r in p.rows) for c in relevant}
+        if any(v < 0 for v in self.row_left.values()) or any(v < 0 for v in self.col_left.values()):
+            return None
+        if sum(self.row_left.values()) != sum(self.col_left.values()):
+            return None
+
+        self.x = x
+        self.free = {r: [c for c in relevant if not x[r, c]] for r in p.rows}
+        while any(self.row_left.values()):
+            if not self._augment():
+                return None
+        return {r: {c: x[r, c] for c in relevant} for r in p.rows}
+
+    def _augment(self):
+        """Push one more blank from a row with blanks left to a column with room."""
+        p, x = self.problem, self.x
+        forced = p.known_cells
+        parent_row = {r: None for r in p.rows if self.row_left[r] > 0}   # row ➜ col it came from
+        parent_col = {}                                                 # col ➜ row it came from
+        queue = deque(parent_row)
+        while queue:
+            r = queue.popleft()
+            for c in self.free[r]:
+                if c in parent_col or x[r, c]:
+                    continue
+                parent_col[c] = r
+                if self.col_left[c] > 0:
+                    self.col_left[c] -= 1
+                    while True:                      # flip the path back to the source
+                        r = parent_col[c]
+                        x[r, c] = 1
+                        prev = parent_row[r]
+                        if prev is None:
+                            self.row_left[r] -= 1
+                            return True
+                        x[r, prev] = 0
+                        c = prev
+                # move a blank already in column c to another column
+                for r2 in p.rows:
+                    if x[r2, c] and (r2, c) not in forced and r2 not in parent_row:
+                        parent_row[r2] = c
+                        queue.append(r2)
+        return False
+
+
+# ──────────────────────────────────────────────────────────────
+#     ILP backend
+# ──────────────────────────────────────────────────────────────
+class ILPBlankSolver:
+    """
+    The same model as a 0/1 integer program, solved with PuLP's bundled CBC.
+
+    One binary per (row, relevant column) cell; equality constraints for the
+    row sums, column sums, F / en 100 g grand totals and group quotas; known
+    cells fixed to 1 and cells of zero-quota (group, column) pairs fixed to 0.
+    PuLP is optional (`pip install pulp`) and only imported here.
+
+    solve() has the same contract as BlankSolver.solve(); status ends up as
+    "solved", "infeasible" or "time limit" (CBC stopped before an answer).
+    """
+
+    def __init__(self, problem, time_limit=None):
+        self.problem = problem
+        self.time_limit = time_limit
+        self.status = None
+        self.partial = None                  # CBC keeps no partial grid
+
+    def solve(self):
+        try:
+            import pulp
+        except ImportError as exc:
+            raise ImportError("The 'ilp' backend needs PuLP: pip install pulp") from exc
+
+        p = self.problem
+        relevant = p.relevant_cols
+        if any(c not in relevant for (_, c) in p.known_cells):
+            self.status = "infeasible"
+            return None
+
+        model = pulp.LpProblem("blank_grid", pulp.LpMinimize)
+        x = {(r, c): pulp.LpVariable(f"x_{i}_{j}", cat="Binary")
+             for i, r in enumerate(p.rows) for j, c in enumerate(relevant)}
+        model += pulp.lpSum([])                                  # feasibility only
+
+        for r in p.rows:
+            model += pulp.lpSum(x[r, c] for c in relevant) == p.row_blanks[r]
+        for c in relevant:
+            model += pulp.lpSum(x[r, c] for r in p.rows) == p.col_blanks[c]
+        model += pulp.lpSum(x[r, c] for r in p.rows for c in relevant
+                            if c.endswith(" F")) == p.F_total
+        model += pulp.lpSum(x[r, c] for r in p.rows for c in relevant
+                            if c.endswith("en 100 g")) == p.g100_total
+        for (group, c), need in p.group_col_req.items():
+            cells = [x[r, c] for r in p.rows if p.row_groups.get(r) == group and c in relevant]
+            model += pulp.lpSum(cells) == need
+        for r, c in p.known_cells:
+            model += x[r, c] == 1
+
+        model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=self.time_limit))
+        status = pulp.LpStatus[model.status]
+        if status != "Optimal":
+            timed_out = self.time_limit is not None and status == "Not Solved"
+            self.status = "time limit" if timed_out else "infeasible"
+            return None
+        self.status = "solved"
+        return {r: {c: int(round(x[r, c].value())) for c in relevant} for r in p.rows}
+
+
+# ──────────────────────────────────────────────────────────────
+#     Backends
+# ──────────────────────────────────────────────────────────────
+# name ➜ solver class; every class takes (problem, **options) and has solve()
+BACKENDS = {
+    "backtrack": BlankSolver,
+    "portfolio": PortfolioSolver,
+    "ilp": ILPBlankSolver,
+}
+
+
+def make_solver(problem, backend="backtrack", **options):
+    """Build the solver of the named backend (see BACKENDS)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {list(BACKENDS)}")
+    return BACKENDS[backend](problem, **options)
+
+
+def solve(problem, backend="backtrack", **options):
+    """Shortcut for make_solver(problem, backend, **options).solve()."""
+    return make_solver(problem, backend, **options).solve()
+
+
+def count_solutions(problem, workers=1, split_rows=None):
+    """Shortcut for BlankSolver(problem).count(workers, split_rows)."""
+    return BlankSolver(problem).count(workers, split_rows)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache for the batch rebuild (nutrition_batch.py).
+
+A section is keyed on the SHA-256 of its normalized raw text (line ends
+and trailing blanks dropped), the parse profile, the output format and
+the parser / solver versions.  When a key is already in the cache and its workbook is
+still the file that key wrote (same mtime and size) the section is not
+rebuilt: the cached report is reused and its long rows (nutrient_store
+layout) are read back from the cache folder.  A workbook rewritten since,
+by another version of the page or by a section with the same title,
+makes the key a miss.
+
+    <out_dir>/.build_cache/index.json        key ➜ report (title, output, seconds, …)
+    <out_dir>/.build_cache/<key>.parquet     long rows of that section
+                                             (.pickle when pyarrow is not installed)
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import time
+
+import pandas as pd
+
+from blank_solver import SOLVER_VERSION
+from nutrient_store import write_store
+from section_parser import PARSER_VERSION
+
+CACHE_DIR = ".build_cache"
+ROWS_FORMAT = "parquet" if importlib.util.find_spec("pyarrow") else "pickle"
+
+
+def normalize_section(section):
+    """The section text with \\r\\n, trailing blanks and surrounding blank lines removed."""
+    return "\n".join(line.rstrip() for line in section.splitlines()).strip()
+
+
+def section_key(section, profile="page", fmt="xlsx"):
+    text = f"parser={PARSER_VERSION} solver={SOLVER_VERSION} profile={profile} format={fmt}\n"
+    text += normalize_section(section)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def output_key(path):
+    """[mtime_ns, size] of a written output, or None when it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def write_rows(long, path):
+    if ROWS_FORMAT == "parquet":
+        long.to_parquet(path, index=False)
+    else:
+        long.to_pickle(path)
+
+
+def read_rows(path):
+    return pd.read_parquet(path) if ROWS_FORMAT == "parquet" else pd.read_pickle(path)
+
+
+class BuildCache:
+    """Reports and long rows of the sections built into one output folder."""
+
+    def __init__(self, out_dir):
+        self.folder = os.path.join(out_dir, CACHE_DIR)
+        self.index_path = os.path.join(self.folder, "index.json")
+        os.makedirs(self.folder, exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as fh:
+                self.index = json.load(fh)
+        except (OSError, ValueError):
+            self.index = {}
+        self.entries = self.index.setdefault("sections", {})
+        self.seen = []
+        self.changed = False
+
+    def rows_path(self, key):
+        return os.path.join(self.folder, f"{key}.{ROWS_FORMAT}")
+
+    def get(self, key):
+        """The cached report of `key`, or None if it has to be rebuilt."""
+        self.seen.append(key)
+        entry = self.entries.get(key)
+        if (entry and entry.get("output_key") == output_key(entry["output"])
+                and os.path.exists(self.rows_path(key))):
+            return entry
+        return None
+
+    def put(self, key, report):
+        report = dict(report, built=time.strftime("%Y-%m-%d %H:%M:%S"),
+                      output_key=output_key(report["output"]))
+        self.entries[key] = report
+        self.changed = True
+        return report
+
+    def save(self):
+        if self.changed:
+            with open(self.index_path, "w", encoding="utf-8") as fh:
+                json.dump(self.index, fh, ensure_ascii=False, indent=1)
+
+    def write_store(self, path):
+        """
+        The long table of every section seen, concatenated from the cache.
+
+        Skipped when nothing was rebuilt and `path` was written from the
+        same sections last time; returns True if the store was written.
+        """
+        keys = list(dict.fromkeys(self.seen))
+        store = self.index.get("store", {})
+        if (not self.changed and store.get("path") == path and store.get("keys") == keys
+                and os.path.exists(path)):
+            return False
+        parts = [read_rows(self.rows_path(k)) for k in keys if k in self.entries]
+        write_store(pd.concat(parts, ignore_index=True), path)
+        self.index["store"] = {"path": path, "keys": keys}
+        self.changed = True
+        return True
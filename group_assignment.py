@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# group_assignment.py
+# --------------------------------------------------------------------------- #
+#  Group-by-group blank distribution used by `blank tables ready V4.py`       #
+# --------------------------------------------------------------------------- #
+#
+#  A trial no longer copies the DataFrame and the tally dicts: the blanks of
+#  the group live in a small NumPy matrix and the tallies in integer
+#  counters, both changed in place and undone when a trial fails.  The
+#  output DataFrame is only built once an assignment succeeds.
+#
+#  Rows are searched depth-first instead of crossing every row's
+#  combinations with product(), so an exhausted column or quota cuts the
+#  branch as soon as the row that exhausts it is placed.
+
+from itertools import combinations
+
+import numpy as np
+
+FULL_BLANK = 27
+
+
+# --------------------------------------------------------------------------- #
+#  Step 1 – Pre-fill fully blank columns                                      #
+# --------------------------------------------------------------------------- #
+def prefill_full_columns(df, col_targets, remaining_col_blanks, nutrient_to_blank_row,
+                         groups_blanks, group_column_type_used, full_blank=FULL_BLANK):
+    """Mark every row of the columns that need `full_blank` blanks (in place)."""
+    for col, target in col_targets.items():
+        if target != full_blank:
+            continue
+        for i, row in df.iterrows():
+            nutrient = row['Nutriente']
+            group = row['Grupos']
+            if nutrient in nutrient_to_blank_row and nutrient_to_blank_row[nutrient] > 0:
+                df.at[i, col] = "X"
+                remaining_col_blanks[col] -= 1
+                nutrient_to_blank_row[nutrient] -= 1
+                if group in groups_blanks:
+                    groups_blanks[group] -= 1
+                if group in group_column_type_used:
+                    if col.endswith("F"):
+                        group_column_type_used[group]["F"] += 1
+                    elif col.endswith("en 100 g"):
+                        group_column_type_used[group]["en 100 g"] += 1
+
+
+# --------------------------------------------------------------------------- #
+#  Step 2 – Backtracking group assignment                                     #
+# --------------------------------------------------------------------------- #
+class _GroupTrial:
+    """Blank matrix and counters for one group, changed in place."""
+
+    def __init__(self, group_name, nutrients, cols, remaining_col_blanks,
+                 groups_blanks, group_column_type_targets, group_column_type_used):
+        self.nutrients = nutrients
+        self.marks = np.zeros((len(nutrients), len(cols)), dtype=np.uint8)
+        self.col_left = np.array([remaining_col_blanks[c] for c in cols], dtype=np.int64)
+        self.is_F = np.array([c.endswith("F") for c in cols])
+        self.is_g100 = np.array([(not c.endswith("F")) and c.endswith("en 100 g") for c in cols])
+
+        self.group_left = groups_blanks.get(group_name, 0)
+        used = group_column_type_used.get(group_name, {'F': 0, 'en 100 g': 0})
+        self.used_F, self.used_g100 = used['F'], used['en 100 g']
+        limits = group_column_type_targets.get(group_name)
+        self.limit_F = limits['F'] if limits else None
+        self.limit_g100 = limits['en 100 g'] if limits else None
+
+    def place(self, t, combo):
+        """Put row t's blanks in the columns `combo` (indices); False if not allowed."""
+        if not combo:
+            return True
+        idx = list(combo)
+        if (self.col_left[idx] <= 0).any():
+            return False
+        n_F = int(self.is_F[idx].sum())
+        n_g100 = int(self.is_g100[idx].sum())
+        if self.limit_F is not None and (self.used_F + n_F > self.limit_F
+                                         or self.used_g100 + n_g100 > self.limit_g100):
+            return False
+        if self.group_left < n_F + n_g100:
+            return False
+
+        self.marks[t, idx] = 1
+        self.col_left[idx] -= 1
+        self.group_left -= n_F + n_g100
+        self.used_F += n_F
+        self.used_g100 += n_g100
+        return True
+
+    def remove(self, t, combo):
+        """Undo place(t, combo)."""
+        if not combo:
+            return
+        idx = list(combo)
+        n_F = int(self.is_F[idx].sum())
+        n_g100 = int(self.is_g100[idx].sum())
+        self.marks[t, idx] = 0
+        self.col_left[idx] += 1
+        self.group_left += n_F + n_g100
+        self.used_F -= n_F
+        self.used_g100 -= n_g100
+
+
+def try_group_assignment(df, group_name, group_rows, modifiable_cols, remaining_col_blanks,
+                         nutrient_to_blank_row, groups_blanks, group_column_type_targets,
+                         group_column_type_used, stats=None):
+    """
+    Find the first blank placement for the rows of one group.
+
+    Rows are filled depth-first in table order and the column, group and
+    F / en 100 g limits are checked after every row, so a dead branch is
+    dropped before any later row is enumerated.  The first placement found
+    is the same one the old product() loop returned.
+
+    Returns (df, remaining_col_blanks, nutrient_to_blank_row, groups_blanks,
+    group_column_type_used) with the group applied, as new objects, or five
+    Nones if no placement fits.  The inputs are never modified.  When a
+    `stats` dict is given, stats["trials"] counts the row choices tried.
+    """
+    row_indices = group_rows.index.tolist()
+    nutrients = [df.at[i, "Nutriente"] for i in row_indices]
+    needed_blanks = [nutrient_to_blank_row.get(n, 0) for n in nutrients]
+
+    trial = _GroupTrial(group_name, nutrients, modifiable_cols, remaining_col_blanks,
+                        groups_blanks, group_column_type_targets, group_column_type_used)
+    # needs of rows[t:], to check the group / type budget before going deeper
+    still_needed = [sum(needed_blanks[t:]) for t in range(len(needed_blanks) + 1)]
+    if stats is None:
+        stats = {}
+    stats.setdefault("trials", 0)
+
+    def dfs(t):
+        if t == len(row_indices):
+            return True
+        if still_needed[t] > trial.group_left:
+            return False
+        if trial.limit_F is not None and still_needed[t] > (
+                trial.limit_F - trial.used_F + trial.limit_g100 - trial.used_g100):
+            return False
+
+        open_cols = np.flatnonzero(trial.col_left > 0).tolist()
+        for combo in combinations(open_cols, needed_blanks[t]):
+            stats["trials"] += 1
+            if not trial.place(t, combo):
+                continue
+            if dfs(t + 1):
+                return True
+            trial.remove(t, combo)
+        return False
+
+    if dfs(0):
+        return _apply(df, trial, row_indices, modifiable_cols, remaining_col_blanks,
+                      nutrient_to_blank_row, groups_blanks, group_column_type_used,
+                      group_name)
+    return None, None, None, None, None
+
+
+def _apply(df, trial, row_indices, cols, remaining_col_blanks, nutrient_to_blank_row,
+           groups_blanks, group_column_type_used, group_name):
+    """Build the output DataFrame and tallies from a successful trial."""
+    out = df.copy()
+    rows_t, cols_j = np.nonzero(trial.marks)
+    for t, j in zip(rows_t, cols_j):
+        out.at[row_indices[t], cols[j]] = "X"
+
+    col_blanks = {c: int(trial.col_left[j]) for j, c in enumerate(cols)}
+    col_blanks.update({c: v for c, v in remaining_col_blanks.items() if c not in col_blanks})
+
+    row_blanks = dict(nutrient_to_blank_row)
+    for t, nutrient in enumerate(trial.nutrients):
+        if nutrient in row_blanks:
+            row_blanks[nutrient] -= int(trial.marks[t].sum())
+
+    group_blanks = dict(groups_blanks)
+    group_blanks[group_name] = trial.group_left
+
+    type_used = {g: dict(v) for g, v in group_column_type_used.items()}
+    if group_name in type_used:
+        type_used[group_name]['F'] = trial.used_F
+        type_used[group_name]['en 100 g'] = trial.used_g100
+
+    return out, col_blanks, row_blanks, group_blanks, type_used
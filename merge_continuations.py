@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Join the “(continuación N)” pages of each food group into one wide table.
+
+    python merge_continuations.py                      # ➜ merged_tables.xlsx, a sheet per group
+    python merge_continuations.py --split -o merged/   # ➜ merged/6.6.1 Frutas.xlsx, …
+
+Pages are grouped by their numeric code (6.6.1) and ordered by the
+continuation number, whatever the spelling (continuación, continuacion,
+continaucion …); the first page has number 0.  When two files give the
+same code and number (“6.1.2 Trigo y derivados.xlsx” and
+“6.1.2_Trigo_y_derivados.xlsx”) only the first in name order is used and
+the others are reported as skipped.  The food columns of every
+page are placed side by side, rows lined up by nutrient name (and, for
+repeated names such as the two Energía rows, by their order).
+"""
+
+import argparse
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+from nutrient_store import workbook_paths
+from section_parser import FIXED_COLUMNS
+from table_export import ENGINES, WorkbookWriter, export_frame
+from workbook_cache import read_workbook
+
+_PAGE = re.compile(r"^(?P<code>\d+\.\d+\.\d+)[ _]+(?P<name>.*?)"
+                   r"(?:\s*\(\s*conti\w*(?:\s+(?P<part>\d+))?\s*\))?\s*$", re.IGNORECASE)
+
+
+def page_order(title):
+    """(code, name, part) of a page title or file name; part is 0 for the first page."""
+    title = re.sub(r"\.xlsx$", "", os.path.basename(title), flags=re.IGNORECASE)
+    m = _PAGE.match(title)
+    if not m:
+        raise ValueError(f"not a table page: '{title}'")
+    name = m.group("name").replace("_", " ").strip()
+    if m.group("part"):
+        part = int(m.group("part"))
+    else:
+        part = 1 if re.search(r"\(\s*conti\w*\s*\)\s*$", title, re.IGNORECASE) else 0
+    return m.group("code"), name, part
+
+
+def group_pages(paths):
+    """code ➜ (name, paths in continuation order); one page per continuation number."""
+    groups, kept = {}, {}
+    for path in sorted(paths, key=os.path.basename):
+        code, name, part = page_order(path)
+        if (code, part) in kept:
+            print(f"⚠️ Skipping '{os.path.basename(path)}': page {part} of {code} is already "
+                  f"'{os.path.basename(kept[code, part])}'")
+            continue
+        kept[code, part] = path
+        groups.setdefault(code, []).append((part, path, name))
+    merged = {}
+    for code, pages in sorted(groups.items(), key=lambda kv: [int(n) for n in kv[0].split(".")]):
+        pages.sort(key=lambda p: p[0])
+        base_name = min(pages, key=lambda p: p[0])[2]
+        merged[code] = (base_name, [path for _, path, _ in pages])
+    return merged
+
+
+def _row_key(df):
+    """Nutrient name (accents / µ normalized, case folded) plus its occurrence number."""
+    names = df["Nutriente"].fillna("").astype(str).map(
+        lambda s: unicodedata.normalize("NFKC", s).strip().casefold())
+    return list(zip(names, names.groupby(names).cumcount()))
+
+
+def merge_pages(frames):
+    """One wide table from pages of the same group, in the given order."""
+    fixed = None
+    food_parts, taken = [], set()
+    for df in frames:
+        df = df.copy()
+        df.index = pd.MultiIndex.from_tuples(_row_key(df))
+        page_fixed = df[FIXED_COLUMNS]
+        fixed = page_fixed if fixed is None else pd.concat(
+            [fixed, page_fixed[~page_fixed.index.isin(fixed.index)]])
+
+        foods = df[df.columns[len(FIXED_COLUMNS):]]
+        renamed = []
+        for col in foods.columns:
+            new, n = col, 2
+            while new in taken:
+                new, n = f"{col} ({n})", n + 1
+            taken.add(new)
+            renamed.append(new)
+        foods.columns = renamed
+        food_parts.append(foods)
+
+    wide = pd.concat([fixed] + food_parts, axis=1, join="outer", sort=False)
+    return wide.reset_index(drop=True)
+
+
+def merge_groups(paths=None):
+    """“<code> <name>” ➜ merged DataFrame for every group of `paths` (default: repo pages)."""
+    paths = workbook_paths() if paths is None else paths
+    merged = {}
+    for code, (name, pages) in group_pages(paths).items():
+        frames = [read_workbook(p) for p in pages]
+        merged[f"{code} {name}"] = merge_pages(frames)
+        print(f"🔗 {code} {name}: {len(pages)} page(s), "
+              f"{(merged[f'{code} {name}'].shape[1] - len(FIXED_COLUMNS)) // 2} foods")
+    return merged
+
+
+def write_merged(merged, output="merged_tables.xlsx", split=False, engine="xlsxwriter"):
+    """One workbook with a sheet per group, or (split=True) one workbook per group in `output`."""
+    if split:
+        os.makedirs(output, exist_ok=True)
+        for title, df in merged.items():
+            export_frame(df, os.path.join(output, title + ".xlsx"), engine=engine)
+        return
+    with WorkbookWriter(output, engine=engine) as book:
+        for title, df in merged.items():
+            book.add(title, df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="page workbooks (default: the repo's pages)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="workbook (default merged_tables.xlsx) or, with --split, a folder")
+    parser.add_argument("--split", action="store_true", help="one workbook per group")
+    parser.add_argument("--engine", choices=ENGINES, default="xlsxwriter")
+    args = parser.parse_args()
+
+    output = args.output or ("merged" if args.split else "merged_tables.xlsx")
+    merged = merge_groups(args.paths or None)
+    write_merged(merged, output, split=args.split, engine=args.engine)
+    print(f"✅ {len(merged)} group(s) saved to '{output}'")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Lookup index on the long nutrient table (nutrient_store.py).
+
+    python nutrient_index.py build
+    python nutrient_index.py lookup --tagname VITA --section Pescados
+    python nutrient_index.py lookup --food "Atun en aceite"
+    python nutrient_index.py lookup --nutrient "Ac. folico" --section 6.6.1
+
+Every tagname, nutrient, food and section of the store is mapped to the
+row positions where it appears, so a lookup is a dict access plus an
+intersection of position arrays; no workbook is read.  Names are matched
+without accents, case, underscores or punctuation (“Ác._fólico” and “Ac.
+folico” are the same key), and a section is also found by its code
+(6.9.2) or its name without the continuation (“Pescados”).
+
+The index is saved next to the store (<store>.index.pkl) together with
+the store's mtime and size, and rebuilt when the store changes.
+"""
+
+import argparse
+import os
+import pickle
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from merge_continuations import page_order
+from nutrient_store import STORE_PATH, load_store
+
+INDEX_KINDS = ("tagname", "nutrient", "food", "section")
+_PUNCTUATION = re.compile(r"[\W_]+")
+
+
+def normalize_name(name):
+    """Lower-case ASCII words: accents, µ/μ, underscores and punctuation removed."""
+    text = unicodedata.normalize("NFKD", unicodedata.normalize("NFKC", str(name)))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _PUNCTUATION.sub(" ", text.casefold()).strip()
+
+
+def _section_keys(section):
+    """The full title, plus the code and the name of the page group when it has them."""
+    keys = [section]
+    try:
+        code, name, _ = page_order(section)
+    except ValueError:
+        return keys
+    return keys + [code, name]
+
+
+def index_key(path):
+    st = os.stat(path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+class NutrientIndex:
+    """kind ➜ normalized name ➜ sorted row positions in the long table."""
+
+    def __init__(self, maps, store_key=None):
+        self.maps = maps
+        self.store_key = store_key
+
+    @classmethod
+    def build(cls, long, store_key=None):
+        maps = {}
+        for kind in INDEX_KINDS:
+            groups = long.groupby(long[kind].astype(str), observed=True, sort=False).indices
+            entries = {}
+            for name, positions in groups.items():
+                names = _section_keys(name) if kind == "section" else [name]
+                for key in {normalize_name(n) for n in names}:
+                    entries.setdefault(key, []).append(positions)
+            maps[kind] = {k: np.unique(np.concatenate(v)).astype(np.int32)
+                          for k, v in entries.items()}
+        return cls(maps, store_key)
+
+    def save(self, path):
+        with open(path, "wb") as fh:
+            pickle.dump({"store_key": self.store_key, "maps": self.maps}, fh,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as fh:
+            data = pickle.load(fh)
+        return cls(data["maps"], data["store_key"])
+
+    def positions(self, kind, name):
+        """Row positions of `name` (any spelling) for one kind; empty if unknown."""
+        return self.maps[kind].get(normalize_name(name), np.empty(0, dtype=np.int32))
+
+    def names(self, kind):
+        return sorted(self.maps[kind])
+
+    def lookup(self, long, **names):
+        """The rows of `long` matching every given kind=name (tagname=, food=, …)."""
+        unknown = set(names) - set(INDEX_KINDS)
+        if unknown:
+            raise ValueError(f"unknown index kind(s): {', '.join(sorted(unknown))}")
+        hits = None
+        for kind, name in names.items():
+            if name is None:
+                continue
+            found = self.positions(kind, name)
+            hits = found if hits is None else np.intersect1d(hits, found, assume_unique=True)
+        if hits is None:
+            return long
+        return long.iloc[hits]
+
+
+def index_path(store=STORE_PATH):
+    return store + ".index.pkl"
+
+
+def open_index(store=STORE_PATH):
+    """(long table, index); the saved index is reused while the store is unchanged."""
+    long = load_store(store)
+    key = index_key(store)
+    path = index_path(store)
+    if os.path.exists(path):
+        index = NutrientIndex.load(path)
+        if index.store_key == key:
+            return long, index
+    index = NutrientIndex.build(long, key)
+    index.save(path)
+    return long, index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    bu = sub.add_parser("build", help="(re)build the index of the store")
+    bu.add_argument("-s", "--store", default=STORE_PATH)
+    lo = sub.add_parser("lookup", help="rows matching all the given names")
+    lo.add_argument("-s", "--store", default=STORE_PATH)
+    for kind in INDEX_KINDS:
+        lo.add_argument(f"--{kind}")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        long = load_store(args.store)
+        index = NutrientIndex.build(long, index_key(args.store))
+        index.save(index_path(args.store))
+        sizes = ", ".join(f"{len(index.maps[k])} {k}s" for k in INDEX_KINDS)
+        print(f"✅ Index of {len(long)} rows ({sizes}) saved to '{index_path(args.store)}' "
+              f"in {time.perf_counter() - start:.2f} s")
+    elif args.command == "lookup":
+        long, index = open_index(args.store)
+        loaded = time.perf_counter()
+        hits = index.lookup(long, **{k: getattr(args, k) for k in INDEX_KINDS})
+        found = time.perf_counter()
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(hits[["section", "food", "nutrient", "tagname", "unit", "flag", "value"]]
+                  .to_string(index=False, float_format=lambda v: f"{v:.6g}"))
+        print(f"✅ {len(hits)} rows; store + index loaded in {(loaded - start) * 1e3:.1f} ms, "
+              f"lookup {(found - loaded) * 1e6:.0f} µs")
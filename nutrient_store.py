@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+One long table with every nutrient value of the exported workbooks.
+
+    python nutrient_store.py build                        # ➜ nutrients.parquet
+    python nutrient_store.py build -o nutrients.feather
+    python nutrient_store.py query "tagname == 'FE' and value > 5"
+    python nutrient_store.py info                         # dtypes and memory
+
+Each wide sheet (Grupos, Nutriente, Tagname, Unidad, <food> F,
+<food> en 100 g, …) is melted into rows of
+
+    section, food, group, nutrient, tagname, unit, flag, value
+
+with `value` a float32 (NaN for '-' / blank cells) and `flag` the source
+code of the F column.  The text columns are categoricals whose categories
+are shared by every section, so the whole book takes a fraction of the
+memory of the string tables.  The result is stored as Parquet or Feather,
+so a query over the whole book reads one columnar file instead of every
+xlsx.
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from section_parser import FIXED_COLUMNS
+from workbook_cache import read_workbook
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STORE_PATH = os.path.join(HERE, "nutrients.parquet")
+LONG_COLUMNS = ["section", "food", "group", "nutrient", "tagname", "unit", "flag", "value"]
+CATEGORY_COLUMNS = LONG_COLUMNS[:-1]
+VALUE_DTYPE = "float32"
+
+
+# ──────────────────────────────────────────────────────────────
+#     Wide ➜ long
+# ──────────────────────────────────────────────────────────────
+def workbook_paths(folder=HERE):
+    """The per-page workbooks of the repo (6.x.y …xlsx)."""
+    return sorted(p for p in glob.glob(os.path.join(folder, "*.xlsx"))
+                  if re.match(r"\d+\.\d+\.\d+", os.path.basename(p)))
+
+
+def _food_name(flag_col, value_col):
+    if flag_col.endswith(" F"):
+        return flag_col[:-2]
+    if value_col.endswith(" en 100 g"):
+        return value_col[:-len(" en 100 g")]
+    return flag_col
+
+
+def melt_frame(df, section):
+    """
+    The long rows of one wide table.
+
+    Food columns are taken in pairs by position (flag, value), so a
+    mangled header still lines up with its numbers.
+    """
+    food_cols = list(df.columns[len(FIXED_COLUMNS):])
+    flag_cols, value_cols = food_cols[0::2], food_cols[1::2]
+    n_foods = min(len(flag_cols), len(value_cols))
+    flag_cols, value_cols = flag_cols[:n_foods], value_cols[:n_foods]
+    n_rows = len(df)
+
+    # food-major order: every nutrient of food 1, then food 2, …
+    flags = df[flag_cols].to_numpy(dtype=object).T.ravel()
+    values = df[value_cols].to_numpy(dtype=object).T.ravel()
+    fixed = {col: np.tile(df[src].to_numpy(dtype=object), n_foods)
+             for col, src in zip(["group", "nutrient", "tagname", "unit"], FIXED_COLUMNS)}
+
+    long = pd.DataFrame({
+        "section": section,
+        "food": np.repeat([_food_name(f, v) for f, v in zip(flag_cols, value_cols)], n_rows),
+        **fixed,
+        "flag": flags,
+        "value": pd.to_numeric(pd.Series(values, dtype=object).astype(str).str.strip(),
+                               errors="coerce"),
+    }, columns=LONG_COLUMNS)
+    for col in ["group", "nutrient", "tagname", "unit", "flag"]:
+        long[col] = long[col].where(long[col].notna(), "").astype(str).str.strip()
+    return long
+
+
+def melt_sheet(path):
+    """The long rows of one exported workbook; the section is the file name."""
+    section = os.path.splitext(os.path.basename(path))[0]
+    return melt_frame(read_workbook(path), section)
+
+
+def typed(long):
+    """
+    The long table with categorical text columns and float32 values.
+
+    Call it on the concatenated book, not per section: pd.concat() of
+    categoricals with different categories falls back to plain strings.
+    """
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS if long[col].dtype != "category"}
+    if long["value"].dtype != VALUE_DTYPE:
+        dtypes["value"] = VALUE_DTYPE
+    return long.astype(dtypes) if dtypes else long
+
+
+# ──────────────────────────────────────────────────────────────
+#     Store
+# ──────────────────────────────────────────────────────────────
+def write_store(long, path=STORE_PATH):
+    """Write the (typed) long table as Parquet or Feather, chosen by the file extension."""
+    long = typed(long).reset_index(drop=True)
+    if path.endswith(".feather"):
+        long.to_feather(path)
+    else:
+        long.to_parquet(path, index=False)
+
+
+def build_store(paths=None, path=STORE_PATH):
+    """Melt every workbook in `paths` (default: the repo's pages) into one store."""
+    paths = workbook_paths() if paths is None else paths
+    long = pd.concat([melt_sheet(p) for p in paths], ignore_index=True)
+    write_store(long, path)
+    return long
+
+
+def load_store(path=STORE_PATH, columns=None):
+    """The long table (only `columns`, if given), categoricals and float32 values."""
+    if path.endswith(".feather"):
+        long = pd.read_feather(path, columns=columns)
+    else:
+        long = pd.read_parquet(path, columns=columns)
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS
+              if col in long and long[col].dtype != "category"}
+    if "value" in long and long["value"].dtype != VALUE_DTYPE:
+        dtypes["value"] = VALUE_DTYPE
+    return long.astype(dtypes) if dtypes else long
+
+
+# ──────────────────────────────────────────────────────────────
+#     CLI
+# ──────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    bu = sub.add_parser("build", help="melt every 6.x.y workbook into the store")
+    bu.add_argument("paths", nargs="*", help="workbooks (default: the repo's pages)")
+    bu.add_argument("-o", "--output", default=STORE_PATH, help=".parquet or .feather file")
+    qu = sub.add_parser("query", help="print the rows matching a DataFrame.query() expression")
+    qu.add_argument("expr", help="""e.g. "tagname == 'FE' and value > 5\"""")
+    qu.add_argument("-s", "--store", default=STORE_PATH)
+    inf = sub.add_parser("info", help="dtypes and memory of the store")
+    inf.add_argument("-s", "--store", default=STORE_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        long = build_store(args.paths or None, args.output)
+        print(f"✅ {len(long)} rows from {long['section'].nunique()} sections saved to "
+              f"'{args.output}' in {time.perf_counter() - start:.2f} s")
+    elif args.command == "query":
+        hits = load_store(args.store).query(args.expr)
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(hits[["section", "food", "nutrient", "tagname", "unit", "flag", "value"]]
+                  .to_string(index=False, float_format=lambda v: f"{v:.6g}"))
+        print(f"✅ {len(hits)} rows in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    elif args.command == "info":
+        long = load_store(args.store)
+        # what the scripts keep: every cell a Python string
+        as_text = long.astype({col: object for col in CATEGORY_COLUMNS})
+        as_text["value"] = [f"{v:.2f}" if v == v else "-" for v in long["value"]]
+        print(long.dtypes.to_string())
+        print(f"✅ {len(long)} rows, {long['section'].nunique()} sections: "
+              f"{long.memory_usage(deep=True).sum() / 1024:.0f} KB typed, "
+              f"{as_text.memory_usage(deep=True).sum() / 1024:.0f} KB as strings")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Parse and export every table section of a set of raw-text dumps.
+
+    python nutrition_batch.py dumps/                       # every *.txt in dumps/
+    python nutrition_batch.py "dumps/6.4.*.txt" -o out/ -j 4
+    python nutrition_batch.py book.txt --profile validated
+    python nutrition_batch.py dumps/ --workbook book.xlsx
+
+Each file may hold one page or many (sections separated by a blank line
+or a “6.x.y …” title line).  Sections are streamed to a process pool,
+parsed with section_parser.parse_section() and written to
+“<title>.xlsx” (or .csv / .parquet, see table_export.py) in the output
+folder; --workbook puts every section in one workbook instead.
+Sections whose text did not change since the last run are skipped (see
+build_cache.py); --force rebuilds everything.  A summary is printed at
+the end.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from build_cache import BuildCache, section_key, write_rows
+from nutrient_store import melt_frame
+from section_parser import PROFILES, iter_sections, parse_section
+from table_export import ENGINES, FORMATS, WorkbookWriter, export_frame
+
+
+# ──────────────────────────────────────────────────────────────
+#     Inputs
+# ──────────────────────────────────────────────────────────────
+def input_files(paths, pattern="*.txt"):
+    """Files named by `paths`: folders are searched for `pattern`, globs expanded."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, pattern)))
+        elif glob.has_magic(path):
+            files += sorted(glob.glob(path))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+
+def read_sections(path):
+    """The table sections of one dump file, read one at a time."""
+    with open(path, encoding="utf-8") as fh:
+        yield from iter_sections(fh)
+
+
+# ──────────────────────────────────────────────────────────────
+#     Worker
+# ──────────────────────────────────────────────────────────────
+def section_frame(section, profile="page"):
+    """(table, DataFrame) of one section, special rows (Orden, …) at the end."""
+    table = parse_section(section, **PROFILES[profile])
+    df = table.to_frame()
+    for row in table.special_rows:
+        df.loc[len(df)] = row.as_list()
+    return table, df
+
+
+def export_section(section, out_dir, profile="page", rows_path=None, fmt="xlsx",
+                   engine="xlsxwriter"):
+    """
+    Parse one section and write it to out_dir; returns a small report dict.
+    With `rows_path`, the long rows (nutrient_store layout) are saved there too.
+    """
+    start = time.perf_counter()
+    table, df = section_frame(section, profile)
+    output = export_frame(df, os.path.join(out_dir, f"{table.title}.{fmt}"), engine=engine)
+    if rows_path:
+        write_rows(melt_frame(df, table.title), rows_path)
+    return {"title": table.title, "output": output, "foods": len(table.foods),
+            "rows": len(df), "seconds": time.perf_counter() - start}
+
+
+# ──────────────────────────────────────────────────────────────
+#     Batch
+# ──────────────────────────────────────────────────────────────
+def run_batch(files, out_dir=".", profile="page", workers=None, cache=None, fmt="xlsx",
+              engine="xlsxwriter"):
+    """
+    Export every section of `files` with `workers` processes.
+
+    Sections are read lazily and at most two per worker are queued, so a
+    dump holding the whole book is never loaded at once.  With a
+    BuildCache, sections whose key is cached are not rebuilt (their report
+    comes back with cached=True).  Returns (done, failed): report dicts of
+    the exported sections and (source, title or None, error) tuples for the
+    ones that failed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    done, failed = [], []
+    pending = {}
+
+    def collect(jobs):
+        for job in jobs:
+            path, title, key = pending.pop(job)
+            try:
+                report = job.result()
+            except Exception as exc:
+                failed.append((path, title, exc))
+                continue
+            report["source"] = path
+            if cache is not None:
+                report = cache.put(key, report)
+            done.append(dict(report, cached=False))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path in files:
+            found = 0
+            try:
+                for section in read_sections(path):
+                    found += 1
+                    title = section.splitlines()[0].strip()
+                    key = rows_path = None
+                    if cache is not None:
+                        key = section_key(section, profile, fmt)
+                        entry = cache.get(key)
+                        if entry is not None:
+                            done.append(dict(entry, cached=True))
+                            continue
+                        rows_path = cache.rows_path(key)
+                    job = pool.submit(export_section, section, out_dir, profile, rows_path,
+                                      fmt, engine)
+                    pending[job] = (path, title, key)
+                    if len(pending) >= 2 * workers:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            except (OSError, UnicodeDecodeError) as exc:
+                failed.append((path, None, exc))
+                continue
+            if not found:
+                failed.append((path, None, ValueError("no table section found")))
+        collect(wait(pending).done)
+    done.sort(key=lambda r: r["title"])
+    return done, failed
+
+
+def run_workbook(files, path, profile="page", engine="xlsxwriter"):
+    """
+    Write every section of `files` to one workbook, a sheet per section.
+
+    The workbook is a single file written in one pass, so sections are
+    parsed here in order and each sheet is flushed before the next one is
+    read.  Returns (done, failed) like run_batch().
+    """
+    done, failed = [], []
+    with WorkbookWriter(path, engine=engine) as book:
+        for source in files:
+            try:
+                for section in read_sections(source):
+                    start = time.perf_counter()
+                    try:
+                        table, df = section_frame(section, profile)
+                        book.add(table.title, df)
+                    except Exception as exc:
+                        failed.append((source, section.splitlines()[0].strip(), exc))
+                        continue
+                    done.append({"title": table.title, "output": path, "source": source,
+                                 "foods": len(table.foods), "rows": len(df),
+                                 "seconds": time.perf_counter() - start})
+            except (OSError, UnicodeDecodeError) as exc:
+                failed.append((source, None, exc))
+    return done, failed
+
+
+def print_summary(done, failed, seconds):
+    print(f"{'section':<56}{'foods':>6}{'rows':>6}{'ms':>9}")
+    for r in done:
+        status = "  (cached)" if r.get("cached") else ""
+        print(f"{r['title'][:55]:<56}{r['foods']:>6}{r['rows']:>6}"
+              f"{r['seconds'] * 1e3:>9.1f}{status}")
+
+    titles = [r["title"] for r in done]
+    repeated = sorted({t for t in titles if titles.count(t) > 1})
+    for t in repeated:
+        print(f"⚠️  '{t}' appears {titles.count(t)} times; its exports overwrote each other")
+    for path, title, exc in failed:
+        print(f"❌ {os.path.basename(path)}{' / ' + title if title else ''}: {exc}")
+    cached = sum(1 for r in done if r.get("cached"))
+    print(f"✅ {len(done) - cached} section(s) exported, {cached} unchanged, "
+          f"{len(failed)} failed, {seconds:.2f} s")
+
+
+# ──────────────────────────────────────────────────────────────
+#     CLI
+# ──────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="raw-text files, folders or glob patterns")
+    parser.add_argument("-o", "--out-dir", default=".", help="folder for the .xlsx files")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--profile", choices=list(PROFILES), default="page",
+                        help="parse options of the script the dumps were written for")
+    parser.add_argument("--pattern", default="*.txt", help="file pattern inside folders")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every section, ignoring the build cache")
+    parser.add_argument("--format", choices=FORMATS, default="xlsx",
+                        help="one file per section in this format")
+    parser.add_argument("--engine", choices=ENGINES, default="xlsxwriter",
+                        help="xlsx writer (xlsxwriter runs in constant-memory mode)")
+    parser.add_argument("--workbook", help="write every section as a sheet of this one "
+                                           "workbook instead (no pool, no cache)")
+    parser.add_argument("--store", help="also write the long table of all sections "
+                                        "(.parquet / .feather, see nutrient_store.py)")
+    args = parser.parse_args()
+
+    files = input_files(args.paths, args.pattern)
+    if not files:
+        sys.exit("❌ No input files found")
+    start = time.perf_counter()
+    if args.workbook:
+        done, failed = run_workbook(files, args.workbook, args.profile, args.engine)
+        print_summary(done, failed, time.perf_counter() - start)
+        sys.exit(1 if failed else 0)
+
+    cache = BuildCache(args.out_dir)
+    if args.force:
+        cache.entries.clear()
+    done, failed = run_batch(files, args.out_dir, args.profile, args.workers, cache,
+                             args.format, args.engine)
+    if args.store and done and cache.write_store(args.store):
+        print(f"✅ Long table saved to '{args.store}'")
+    cache.save()
+    print_summary(done, failed, time.perf_counter() - start)
+    sys.exit(1 if failed else 0)
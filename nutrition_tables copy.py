@@ -1,5 +1,4 @@
-import pandas as pd
-import re
+from section_parser import PROFILES, parse_section, split_sections
 
 # Componente alimentario
 
@@ -55,126 +54,14 @@ Alimento crudo en peso neto P. comestible - P. comestible - P. comestible - P. c
 # Process sections separated by a full blank line
 # ===============================
 
-# Split raw_text into sections (each section separated by an empty line)
-sections = [s.strip() for s in raw_text.split("\n\n") if s.strip()]
+# Only sections containing both "Componente alimentario" and "Nutriente Tagname Unidad"
+valid_sections = split_sections(raw_text)
 
-# Filter sections to process only those containing both "Componente alimentario" and "Nutriente Tagname Unidad"
-valid_sections = [sec for sec in sections if ("Componente alimentario" in sec and "Nutriente Tagname Unidad" in sec)]
-
-# Process each valid section.
+# Process each valid section (see section_parser.py): the last 4 lines are ignored,
+# the first line names the file and the first two lines are skipped.
 for sec in valid_sections:
-    # Split section into lines.
-    sec_lines = sec.splitlines()
-    
-    # --- Ignore the last 4 lines of the section ---
-    if len(sec_lines) >= 4:
-        sec_lines = sec_lines[:-4]
-    
-    # --- Step 0a: Extract file name (first line) and remove the first two lines ---
-    file_name_line = sec_lines[0].strip()
-    data_lines = sec_lines[2:]  # Skip the first two lines.
-    section_text = "\n".join(data_lines)
-    
-    # --- Step 0b: Replace specific words with their correct forms ---
-    replacements = {
-        "Fibra dietética": "Fibra_dietética",
-        "Hidratos de C": "Hidratos_de_C",
-        "Lípidos tot": "Lípidos_tot",
-        "RAE (vit A)": "RAE_(vit_A)",
-        "Ác. ascórbico": "Ác._ascórbico",
-        "Ác. fólico": "Ác._fólico",
-        "Fibra cruda": "Fibra_cruda",
-        "Fibra soluble": "Fibra_soluble",
-        "Proteína cruda": "Proteína_cruda"
-    }
-
-    for old, new in replacements.items():
-        section_text = section_text.replace(old, new)
-    
-    # --- Step 0c: Modify lines following any line that starts with "Energía ENERC" ---
-    sec_lines_mod = section_text.splitlines()
-    mod_lines = []
-    i = 0
-    while i < len(sec_lines_mod):
-        curr_line = sec_lines_mod[i]
-        mod_lines.append(curr_line)
-        if curr_line.strip().startswith("Energía ENERC"):
-            if i + 1 < len(sec_lines_mod):
-                next_line = sec_lines_mod[i+1]
-                if not next_line.strip().startswith("Energía ENERC"):
-                    mod_lines.append("Energía ENERC " + next_line)
-                    i += 2
-                    continue
-        i += 1
-    section_text = "\n".join(mod_lines)
-    
-    # --- Step A: Split section_text into lines ---
-    sec_lines = section_text.splitlines()
-    
-    # --- Step B: Process header block to extract food names ---
-    header_lines = []
-    capture = False
-    for line in sec_lines:
-        if "Componente alimentario" in line:
-            capture = True
-            line = line.replace("Componente alimentario", "").strip()
-            if line:
-                header_lines.append(line)
-            continue
-        if "Nutriente" in line:
-            break
-        if capture and line.strip():
-            header_lines.append(line.strip())
-    
-    food_count = len(header_lines)
-    final_headers = []
-    for h in header_lines:
-        final_headers.append(h + " F")
-        final_headers.append(h + " en 100 g")
-    
-    # --- Step C: Build the full column headers ---
-    columns = ["Grupos", "Nutriente", "Tagname", "Unidad"] + final_headers
-    
-    # --- Step D: Process nutrient rows ---
-    data_rows = []
-    expected_pair_count = food_count * 2
-    start_index = next(i for i, line in enumerate(sec_lines) if "Nutriente Tagname Unidad" in line) + 1
-    group_names_list = ["Elementos principales", "elementos principales", "Ác. grasos", "Minerales", "minerales", "Vitaminas", "vitaminas"]
-    current_group = None
-    for line in sec_lines[start_index:]:
-        line = line.strip()
-        if not line:
-            continue
-        if line in group_names_list:
-            current_group = line.title()
-            continue
-        parts = line.split()
-        if len(parts) < 4:
-            continue
-        nutrient = parts[0]
-        tagname = parts[1]
-        unit = parts[2]
-        raw_values = parts[3:]
-        if len(raw_values) == food_count:
-            processed_values = []
-            for v in raw_values:
-                processed_values.extend([v, v])
-        elif len(raw_values) == expected_pair_count:
-            processed_values = raw_values[:expected_pair_count]
-        else:
-            processed_values = []
-            i_val = 0
-            while i_val < len(raw_values) and len(processed_values) < expected_pair_count:
-                processed_values.append(raw_values[i_val])
-                if i_val + 1 < len(raw_values):
-                    processed_values.append(raw_values[i_val+1])
-                i_val += 2
-        processed_values += [''] * (expected_pair_count - len(processed_values))
-        row = [current_group, nutrient, tagname, unit] + processed_values
-        data_rows.append(row)
-    
-    # --- Step E: Create DataFrame and Export ---
-    df = pd.DataFrame(data_rows, columns=columns)
-    output_filename = file_name_line + ".xlsx"
+    table = parse_section(sec, **PROFILES["crude"])
+    df = table.to_frame()
+    output_filename = table.title + ".xlsx"
     df.to_excel(output_filename, index=False)
     print("✅ File exported as '{}'".format(output_filename))
\ No newline at end of file
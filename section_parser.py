@@ -0,0 +1,330 @@
+"""
+Parser for one raw-text section of the food-composition tables.
+
+A section looks like
+
+    6.9.2 Pescados                                  ← title (file name)
+    Rm-Pes-1 Rm-Pes-2 …                             ← food codes
+    Componente alimentario
+    Bagre, chihuil                                  ← one food per line
+    …
+    Nutriente Tagname Unidad F En 100 g F En 100 g …
+    Elementos principales                           ← group label
+    Energía ENERC kcal 103 103 …
+    kJ 433 433 …                                    ← gets “Energía ENERC ” prepended
+    Humedad WATER % 79.31 77.23 1 67.60 …           ← nutrient, tag, unit, flag/value pairs
+    …
+    Alimento crudo en peso neto P. comestible …     ← footer line(s), dropped
+
+parse_section() walks the lines once: the multi-word nutrient names are
+fixed with a single compiled regex, the Energía/kJ line is patched on the
+fly, and the header and the tokens of every nutrient line are collected
+in the same loop.  The flag/value tokens are then paired, padded and
+validated line by line (pair_tokens()).  The result is
+a NutritionTable; to_frame() gives the DataFrame layout every script
+exports (Grupos, Nutriente, Tagname, Unidad, <food> F, <food> en 100 g,
+…) and to_typed_frame() the same with float32 values and categoricals.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# bump when parse_section() output changes (invalidates build caches)
+PARSER_VERSION = 1
+
+# multi-word nutrient names ➜ single tokens
+REPLACEMENTS = {
+    "Fibra dietética": "Fibra_dietética",
+    "Hidratos de C": "Hidratos_de_C",
+    "Lípidos tot": "Lípidos_tot",
+    "RAE (vit A)": "RAE_(vit_A)",
+    "Ác. ascórbico": "Ác._ascórbico",
+    "Ác. fólico": "Ác._fólico",
+}
+
+# extra names used by the algas pages (Fibra cruda, Fibra soluble, …)
+CRUDE_REPLACEMENTS = {
+    **REPLACEMENTS,
+    "Fibra cruda": "Fibra_cruda",
+    "Fibra soluble": "Fibra_soluble",
+    "Proteína cruda": "Proteína_cruda",
+}
+
+# extra names used by the meat pages (vitamins D/E, Etapa de consumo, …)
+EXTENDED_REPLACEMENTS = {
+    **REPLACEMENTS,
+    "Acetato de vit A": "Acetato_de_vit_A",
+    "Vit E (α tocoferol)": "Vit_E_(α_tocoferol)",
+    "Vit D (colecalciferol)": "Vit_D_(colecalciferol)",
+    "Etapa de consumo": "Etapa_de_consumo",
+}
+
+GROUP_NAMES = ["Elementos principales", "elementos principales", "Ác. grasos", "Minerales", "Vitaminas"]
+GROUP_NAMES_ANY_CASE = GROUP_NAMES[:4] + ["minerales", "Vitaminas", "vitaminas"]
+
+FIXED_COLUMNS = ["Grupos", "Nutriente", "Tagname", "Unidad"]
+
+# names without a tag on the algas pages
+UNTAGGED_NUTRIENTS = ["Fibra_cruda", "Fibra_soluble", "Proteína_cruda"]
+
+# parse_section() options of the scripts, by the kind of dump they read
+PROFILES = {
+    # single page, last line is the “Alimento crudo …” footer (blank tables ready*.py)
+    "page": dict(),
+    # single page without a footer (nutrition_tables.py)
+    "plain": dict(footer_lines=0),
+    # algas-style pages with a 4-line footer (nutrition_tables copy.py)
+    "crude": dict(footer_lines=4, replacements=CRUDE_REPLACEMENTS,
+                  group_names=GROUP_NAMES_ANY_CASE, group_case="title"),
+    # as "crude", with "-" padding and token validation (nutrition_blank_tales.py)
+    "validated": dict(footer_lines=4, replacements=CRUDE_REPLACEMENTS,
+                      group_names=GROUP_NAMES_ANY_CASE, group_case="title",
+                      pad="-", validate=True),
+    # meat pages with Orden / Etapa de consumo rows (blank tables ready V3.1.py)
+    "extended": dict(footer_lines=0, replacements=EXTENDED_REPLACEMENTS, group_case="any",
+                     special_nutrients=("Orden", "Etapa_de_consumo")),
+}
+
+_TITLE = re.compile(r'^\s*\d+\.\d+\.\d+\s')
+_LEADING_NUMBER = re.compile(r'^[\d\.]')
+_TAGNAME = re.compile(r'^[A-Z]+$')
+_UNIT = re.compile(r'^[a-z%µ]')
+_FLAG_NUMBER = re.compile(r'[\d\.]')        # flag cells that are really numbers
+_VALUE_NUMBER = re.compile(r'\d+(\.\d+)?')  # what a valid value cell looks like
+
+_patterns = {}
+
+
+def _replacer(replacements):
+    """One compiled alternation for all replacements (longest name first)."""
+    key = tuple(replacements.items())
+    if key not in _patterns:
+        names = sorted(replacements, key=len, reverse=True)
+        pattern = re.compile("|".join(re.escape(n) for n in names))
+        _patterns[key] = lambda line: pattern.sub(lambda m: replacements[m.group(0)], line)
+    return _patterns[key]
+
+
+@dataclass
+class NutrientRow:
+    group: str
+    nutrient: str
+    tagname: str
+    unit: str
+    values: list                                 # flag, value, flag, value, … (2 per food)
+
+    def as_list(self):
+        return [self.group, self.nutrient, self.tagname, self.unit] + self.values
+
+
+@dataclass
+class NutritionTable:
+    title: str                                   # first line, e.g. "6.9.2 Pescados"
+    codes: list                                  # food codes from the second line
+    foods: list                                  # food names, in column order
+    rows: list = field(default_factory=list)     # NutrientRow per nutrient line
+    special_rows: list = field(default_factory=list)   # rows kept apart (Orden, …)
+
+    @property
+    def food_columns(self):
+        return [col for food in self.foods for col in (f"{food} F", f"{food} en 100 g")]
+
+    @property
+    def columns(self):
+        return FIXED_COLUMNS + self.food_columns
+
+    def to_frame(self):
+        return pd.DataFrame([row.as_list() for row in self.rows], columns=self.columns)
+
+    def to_typed_frame(self):
+        """
+        to_frame() with typed columns: “en 100 g” values as float32 (NaN for
+        '-' and other non-numbers), flags and Grupos / Nutriente / Tagname /
+        Unidad as categoricals.  The four text columns share one set of
+        categories and every flag column another, so each set is built once.
+        """
+        n_rows = len(self.rows)
+        cells = np.array([row.values for row in self.rows], dtype=object)
+        cells = cells.reshape(n_rows, 2 * len(self.foods))
+        values = pd.to_numeric(pd.Series(cells[:, 1::2].ravel(), dtype=object),
+                               errors="coerce").to_numpy(dtype=np.float32).reshape(n_rows, -1)
+        # one factorize and one dtype for the four text columns, another for every flag column
+        text = np.array([[row.group, row.nutrient, row.tagname, row.unit] for row in self.rows],
+                        dtype=object).reshape(n_rows, len(FIXED_COLUMNS))
+        codes, names = pd.factorize(text.ravel())
+        codes, text_dtype = codes.reshape(n_rows, -1), pd.CategoricalDtype(names)
+        data = {col: pd.Categorical.from_codes(codes[:, j], dtype=text_dtype)
+                for j, col in enumerate(FIXED_COLUMNS)}
+        codes, flags = pd.factorize(cells[:, 0::2].ravel())
+        codes, flag_dtype = codes.reshape(n_rows, -1), pd.CategoricalDtype(flags)
+        for j, food in enumerate(self.foods):
+            data[f"{food} F"] = pd.Categorical.from_codes(codes[:, j], dtype=flag_dtype)
+            data[f"{food} en 100 g"] = values[:, j]
+        return pd.DataFrame(data, columns=self.columns, copy=False)
+
+
+def _is_table(section):
+    return "Componente alimentario" in section and "Nutriente Tagname Unidad" in section
+
+
+def iter_sections(lines):
+    """
+    Yield the table sections of a dump one at a time.
+
+    `lines` is any iterable of lines, usually an open file, so only the
+    section being read is held in memory.  A section ends at an empty
+    line or right before a title line (“6.x.y …”); chunks that are not a
+    table (no “Componente alimentario” / “Nutriente Tagname Unidad”) are
+    skipped.
+    """
+    chunk = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line or (_TITLE.match(line) and any(c.strip() for c in chunk)):
+            section = "\n".join(chunk).strip()
+            if section and _is_table(section):
+                yield section
+            chunk = [line] if line else []
+        else:
+            chunk.append(line)
+    section = "\n".join(chunk).strip()
+    if section and _is_table(section):
+        yield section
+
+
+def split_sections(raw_text):
+    """Sections of a multi-page dump held in a string (see iter_sections())."""
+    return list(iter_sections(raw_text.splitlines()))
+
+
+def pair_tokens(raw_rows, food_count, pad=""):
+    """
+    Flag/value cells of a section's nutrient lines: one list of
+    2 · food_count tokens per line.
+
+    A line with one token per food has each token duplicated to (F,
+    en 100 g); any other line is cut to 2 · food_count tokens and padded
+    with `pad`.  This stays a per-line loop: a page has about 25 lines,
+    too few for NumPy to make up its call overhead (python benchmarks.py parse).
+    """
+    expected = food_count * 2
+    cells = []
+    for raw_values in raw_rows:
+        if len(raw_values) == food_count:
+            values = [v for v in raw_values for _ in (0, 1)]
+        else:
+            values = raw_values[:expected]
+        cells.append(values + [pad] * (expected - len(values)))
+    return cells
+
+
+def _validate_cells(cells):
+    """numeric flag ➜ "-", value that is not a plain number ➜ "-" (in place)."""
+    for values in cells:
+        for j in range(0, len(values), 2):
+            if _FLAG_NUMBER.match(values[j]):
+                values[j] = "-"
+            if not _VALUE_NUMBER.fullmatch(values[j + 1]):
+                values[j + 1] = "-"
+
+
+def parse_section(raw_text, footer_lines=1, replacements=REPLACEMENTS, group_names=GROUP_NAMES,
+                  group_case="exact", pad="", validate=False, special_nutrients=()):
+    """
+    Parse one section into a NutritionTable.
+
+    footer_lines      lines dropped at the end (the “Alimento crudo …” line)
+    replacements      multi-word names joined into one token before splitting
+    group_names       lines that start a new group
+    group_case        "exact": match group_names as written and keep the label;
+                      "title": match as written and store label.title();
+                      "any": match ignoring case and store the group_names spelling
+    pad               filler for missing flag/value cells
+    validate          clean the tokens as nutrition_blank_tales.py does: numeric
+                      nutrient ➜ "-", bad tag / unit ➜ "N/A", non-numeric
+                      value ➜ "-", numeric flag ➜ "-"
+    special_nutrients rows kept apart in table.special_rows, values left unpaired
+    """
+    all_lines = raw_text.strip().splitlines()
+    title = all_lines[0].strip() if all_lines else ""
+    codes = all_lines[1].split() if len(all_lines) > 1 else []
+    body = all_lines[2:len(all_lines) - footer_lines] if footer_lines else all_lines[2:]
+
+    fix_names = _replacer(replacements)
+    canonical = {g.lower(): g for g in reversed(group_names)}
+    groups = set(group_names)
+    table = NutritionTable(title=title, codes=codes, foods=[])
+
+    state = "before"                             # before ➜ header ➜ between ➜ rows
+    meta, raw_rows = [], []
+    current_group = None
+    prefix_next = False
+    for line in body:
+        line = fix_names(line)
+        starts_energia = line.strip().startswith("Energía ENERC")
+        if prefix_next and not starts_energia:
+            # the kJ line that follows “Energía ENERC” belongs to Energía
+            line = "Energía ENERC " + line
+            prefix_next = False
+        else:
+            prefix_next = starts_energia
+
+        if state in ("before", "header"):
+            if "Componente alimentario" in line:
+                state = "header"
+                line = line.replace("Componente alimentario", "").strip()
+                if line:
+                    table.foods.append(line)
+                continue
+            if "Nutriente" not in line:
+                if state == "header" and line.strip():
+                    table.foods.append(line.strip())
+                continue
+            state = "between"
+        if state == "between":
+            if "Nutriente Tagname Unidad" in line:
+                state = "rows"
+            continue
+
+        line = line.strip()
+        if not line:
+            continue
+        if group_case == "any" and line.lower() in canonical:
+            current_group = canonical[line.lower()]
+            continue
+        if group_case != "any" and line in groups:
+            current_group = line.title() if group_case == "title" else line
+            continue
+
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        nutrient, tagname, unit, *raw_values = parts
+
+        if nutrient in special_nutrients:
+            filled = raw_values[:len(table.foods) * 2]
+            filled += [""] * (len(table.foods) * 2 - len(filled))
+            table.special_rows.append(NutrientRow(current_group, nutrient, tagname, unit, filled))
+            continue
+
+        if validate:
+            if _LEADING_NUMBER.match(nutrient):
+                nutrient = "-"
+            if not _TAGNAME.match(tagname):
+                tagname = "N/A"
+            if not _UNIT.match(unit):
+                unit = "N/A"
+            if nutrient in UNTAGGED_NUTRIENTS:
+                tagname = ""
+
+        meta.append((current_group, nutrient, tagname, unit))
+        raw_rows.append(raw_values)
+
+    cells = pair_tokens(raw_rows, len(table.foods), pad)
+    if validate:
+        _validate_cells(cells)
+    table.rows = [NutrientRow(*m, values) for m, values in zip(meta, cells)]
+    return table
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Export layer for the parsed tables.
+
+    export_frame(df, "6.9.2 Pescados.xlsx")                 # xlsxwriter, constant memory
+    export_frame(df, "6.9.2 Pescados.xlsx", engine="openpyxl")
+    export_frame(df, "6.9.2 Pescados.csv")                  # or .parquet
+
+    with WorkbookWriter("book.xlsx") as book:               # every section, one pass
+        for table in tables:
+            book.add(table.title, table.to_frame())
+
+pandas' to_excel() hands the cells to the engine column by column, which
+xlsxwriter's constant_memory mode cannot take (it flushes each row as
+soon as the next one starts).  The xlsxwriter path therefore writes the
+frame row by row itself; openpyxl still goes through pandas.
+"""
+
+import math
+import os
+import re
+
+import pandas as pd
+
+ENGINES = ("xlsxwriter", "openpyxl")
+FORMATS = ("xlsx", "csv", "parquet")
+
+EXCEL_SHEET_NAME = 31
+_BAD_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+_TRAILING_PART = re.compile(r"^(.*?)(\s*\([^()]*\))?$", re.DOTALL)
+
+
+def output_format(path):
+    """'xlsx', 'csv' or 'parquet', from the file extension."""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext not in FORMATS:
+        raise ValueError(f"unknown export format '.{ext}' (use one of {', '.join(FORMATS)})")
+    return ext
+
+
+def _fit(head, tail):
+    """head + tail in EXCEL_SHEET_NAME chars, cutting the head first."""
+    room = EXCEL_SHEET_NAME - len(tail)
+    if room < 1:
+        return (head + tail)[:EXCEL_SHEET_NAME]
+    return head[:room].rstrip() + tail
+
+
+def sheet_name(title, taken=()):
+    """
+    An Excel-safe sheet name (≤ 31 chars, no []:*?/\\) not already in `taken`.
+
+    Excel compares sheet names ignoring case, and so does this.  Long titles
+    lose the end of their name rather than a trailing “(continuación 10)”.
+    """
+    base = _BAD_SHEET_CHARS.sub(" ", str(title)).strip() or "Sheet"
+    head, tail = _TRAILING_PART.match(base).groups()
+    tail = tail or ""
+    used = {t.casefold() for t in taken}
+    name, n = _fit(head, tail), 2
+    while name.casefold() in used:
+        name, n = _fit(head, f"{tail} ~{n}"), n + 1
+    return name
+
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):                   # NumPy scalar ➜ Python scalar
+        return value.item()
+    return value
+
+
+def _write_rows(worksheet, df, index=False):
+    """Header, then one write_row() per table row (constant_memory needs row order)."""
+    header = ([df.index.name or ""] if index else []) + [str(c) for c in df.columns]
+    worksheet.write_row(0, 0, header)
+    labels = df.index.tolist()
+    for r, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        values = [_cell(v) for v in row]
+        if index:
+            values.insert(0, _cell(labels[r - 1]))
+        worksheet.write_row(r, 0, values)            # None cells are left empty
+
+
+class WorkbookWriter:
+    """One workbook, one sheet per add() call, written in a single pass."""
+
+    def __init__(self, path, engine="xlsxwriter", constant_memory=True):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine '{engine}' (use one of {', '.join(ENGINES)})")
+        self.path = path
+        self.engine = engine
+        self.sheets = []
+        if engine == "xlsxwriter":
+            import xlsxwriter
+            self.book = xlsxwriter.Workbook(path, {"constant_memory": constant_memory,
+                                                   "strings_to_urls": False,
+                                                   "nan_inf_to_errors": True})
+        else:
+            self.book = pd.ExcelWriter(path, engine="openpyxl")
+
+    def add(self, title, df, index=False):
+        name = sheet_name(title, self.sheets)
+        self.sheets.append(name)
+        if self.engine == "xlsxwriter":
+            _write_rows(self.book.add_worksheet(name), df, index)
+        else:
+            df.to_excel(self.book, sheet_name=name, index=index)
+        return name
+
+    def close(self):
+        self.book.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_frame(df, path, engine="xlsxwriter", constant_memory=True, index=False):
+    """Write one table to `path` as .xlsx, .csv or .parquet."""
+    fmt = output_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=index)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=index)
+    else:
+        with WorkbookWriter(path, engine, constant_memory) as book:
+            book.add("Sheet1", df, index)
+    return path
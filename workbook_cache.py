@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cached reader for exported workbooks.
+
+    df = read_workbook("original_table.xlsx")
+    df = read_workbook("6.9.2 Pescados.xlsx", columns=["Nutriente", "Tagname"])
+
+The first read parses the sheet with openpyxl (read_only=True) and keeps a
+sidecar copy in .workbook_cache/ next to the workbook, keyed on the
+file's mtime and size.  Later reads of an unchanged workbook load the
+sidecar instead (Parquet, or pickle when pyarrow is not installed), and
+only the requested columns.
+
+Cells come back as strings, like pd.read_excel(dtype=str,
+keep_default_na=False): empty cells are "", numbers are str() of the
+value (whole floats without the ".0").
+"""
+
+import importlib.util
+import json
+import os
+import re
+
+import pandas as pd
+
+CACHE_DIR = ".workbook_cache"
+SIDECAR_FORMAT = "parquet" if importlib.util.find_spec("pyarrow") else "pickle"
+
+stats = {"hits": 0, "misses": 0}
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _header(values):
+    """Column names as pandas makes them (Unnamed: i, repeated names ➜ name.1, …)."""
+    names, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None else _text(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def parse_workbook(path, sheet_name=0):
+    """The sheet as a DataFrame of strings, read with openpyxl in read-only mode."""
+    from openpyxl import load_workbook
+
+    book = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = book.worksheets[sheet_name] if isinstance(sheet_name, int) else book[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        columns = _header(next(rows, ()))
+        data = [[_text(v) for v in row[:len(columns)]] + [""] * (len(columns) - len(row))
+                for row in rows]
+    finally:
+        book.close()
+    # drop trailing rows that are empty (read_only sheets may report extra rows)
+    while data and not any(data[-1]):
+        data.pop()
+    return pd.DataFrame(data, columns=columns, dtype=object)
+
+
+def _sidecar(path, sheet_name):
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    sheet = re.sub(r"[^\w.-]+", "_", str(sheet_name))
+    base = os.path.join(folder, f"{os.path.basename(path)}.{sheet}")
+    return folder, base + "." + SIDECAR_FORMAT, base + ".json"
+
+
+def read_workbook(path, columns=None, sheet_name=0):
+    """The sheet of `path` (only `columns`, if given), from the sidecar cache when fresh."""
+    st = os.stat(path)
+    key = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    folder, data_path, key_path = _sidecar(path, sheet_name)
+
+    try:
+        with open(key_path, encoding="utf-8") as fh:
+            fresh = json.load(fh) == key and os.path.exists(data_path)
+    except (OSError, ValueError):
+        fresh = False
+
+    if fresh:
+        stats["hits"] += 1
+        if SIDECAR_FORMAT == "parquet":
+            return pd.read_parquet(data_path, columns=columns)
+        df = pd.read_pickle(data_path)
+        return df[columns] if columns is not None else df
+
+    stats["misses"] += 1
+    df = parse_workbook(path, sheet_name)
+    os.makedirs(folder, exist_ok=True)
+    if SIDECAR_FORMAT == "parquet":
+        df.to_parquet(data_path, index=False)
+    else:
+        df.to_pickle(data_path)
+    with open(key_path, "w", encoding="utf-8") as fh:
+        json.dump(key, fh)
+    return df[columns] if columns is not None else df